@@ -6,61 +6,79 @@ Runs the sync automation on a schedule
 
 import schedule
 import time
-from trello_sync import TrelloSync
+from trello_sync_scheduler import AdaptiveSyncScheduler
+from config import TrelloConfig
 from datetime import datetime
 
-def run_sync():
-    """Run the sync automation"""
-    print(f"\n🔄 Running scheduled sync at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+def print_result(result: dict):
+    """Summarize a sync run"""
+    kind = "Full scan" if result['full_scan'] else "Incremental sync"
+    print(f"✅ {kind} completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   - Synced: {result['synced']} cards")
+    print(f"   - Skipped: {result['skipped']} cards")
+    if result['failed']:
+        print(f"   - Failed: {result['failed']} cards")
+    print(f"   - Total: {result['total']} cards")
+    print(f"   - Updated: {result['written']} of {result['changed']} changed cards "
+          f"({result['unchanged']} unchanged)")
     print("=" * 60)
+
+def run_sync(scheduler: AdaptiveSyncScheduler):
+    """Run whatever the scheduler has due, as one single-flight sync
     
+    Overlapping triggers (a board poll coming due during the 9:00 full scan, say)
+    are merged, and nothing runs while another process holds the sync lock.
+    """
     try:
-        sync = TrelloSync()
-        result = sync.run_full_sync()
-        
+        result = scheduler.tick()
         if result:
-            print(f"✅ Sync completed successfully")
-            print(f"   - Synced: {result['synced']} cards")
-            print(f"   - Skipped: {result['skipped']} cards")
-            print(f"   - Total: {result['total']} cards")
-        else:
-            print("❌ Sync failed")
-            
+            print_result(result)
     except Exception as e:
         print(f"❌ Sync error: {e}")
-    
-    print("=" * 60)
 
 def main():
     """Main scheduler function"""
     print("🚀 Starting Trello Auto-Sync Scheduler")
     print("=" * 50)
     
-    # Schedule syncs
-    schedule.every(15).minutes.do(run_sync)  # Every 15 minutes
-    schedule.every().hour.do(run_sync)       # Every hour
-    schedule.every().day.at("09:00").do(run_sync)  # Daily at 9 AM
-    schedule.every().day.at("17:00").do(run_sync)  # Daily at 5 PM
+    if TrelloConfig.VIRTUAL_MASTER:
+        # The dashboard builds the master view from the source boards; there is nothing to copy
+        print("🪞 Virtual master mode is on (TRELLO_VIRTUAL_MASTER), no cards need syncing")
+        return
     
-    print("📅 Sync schedule:")
-    print("   - Every 15 minutes")
-    print("   - Every hour")
-    print("   - Daily at 9:00 AM")
-    print("   - Daily at 5:00 PM")
+    if TrelloConfig.REALTIME_SYNC:
+        # Webhooks keep the master board current; a full scan only catches missed events
+        scheduler = AdaptiveSyncScheduler(poll=False)
+        check_at = TrelloConfig.REALTIME_CONSISTENCY_CHECK_AT
+        schedule.every().day.at(check_at).do(scheduler.request_full_scan)
+        
+        print("📅 Sync schedule (real-time mode, changes arrive via webhooks):")
+        print(f"   - Daily consistency check at {check_at}")
+    else:
+        # Boards are polled incrementally on their own adaptive intervals
+        scheduler = AdaptiveSyncScheduler()
+        schedule.every().day.at("09:00").do(scheduler.request_full_scan)  # Daily at 9 AM
+        schedule.every().day.at("17:00").do(scheduler.request_full_scan)  # Daily at 5 PM
+        
+        print("📅 Sync schedule:")
+        print(f"   - Each board polled incrementally every "
+              f"{TrelloConfig.SYNC_POLL_MIN_INTERVAL / 60:.0f}-{TrelloConfig.SYNC_POLL_MAX_INTERVAL / 60:.0f} "
+              f"minutes, depending on how busy it is")
+        print("   - Full scan daily at 9:00 AM")
+        print("   - Full scan daily at 5:00 PM")
     print("\n🔄 Starting scheduler... (Press Ctrl+C to stop)")
     
-    # Run initial sync
-    run_sync()
+    # Run initial sync (does a full scan first if there are no saved cursors)
+    scheduler.request_boards(*scheduler.sync.SOURCE_BOARDS)
     
     # Keep running
     try:
         while True:
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            run_sync(scheduler)
+            time.sleep(30)  # Check twice a minute
     except KeyboardInterrupt:
         print("\n🛑 Scheduler stopped by user")
 
 if __name__ == "__main__":
     main()
-
-
@@ -14,6 +14,68 @@ class TrelloConfig:
     IS_PRODUCTION = os.getenv('VERCEL') == '1'  # Vercel sets this automatically
     BASE_URL = os.getenv('BASE_URL', 'http://localhost:8080')
     
+    # HTTP connection pooling for the shared Trello session
+    HTTP_POOL_CONNECTIONS = int(os.getenv('TRELLO_POOL_CONNECTIONS', '4'))  # Number of host pools to keep
+    HTTP_POOL_MAXSIZE = int(os.getenv('TRELLO_POOL_MAXSIZE', '10'))  # Max open connections per host
+    HTTP_POOL_BLOCK = os.getenv('TRELLO_POOL_BLOCK', 'true').lower() == 'true'  # Wait for a free connection instead of opening extras
+    HTTP_KEEP_ALIVE = os.getenv('TRELLO_KEEP_ALIVE', 'true').lower() == 'true'
+    HTTP_TIMEOUT = float(os.getenv('TRELLO_HTTP_TIMEOUT', '30'))
+    HTTP_KEEP_ALIVE_TIMEOUT = float(os.getenv('TRELLO_KEEP_ALIVE_TIMEOUT', '30'))  # Seconds an idle async connection stays open
+    ASYNC_MAX_CONCURRENCY = int(os.getenv('TRELLO_ASYNC_MAX_CONCURRENCY', '10'))  # In-flight requests per AsyncTrelloClient
+    
+    # Client-side rate limiting (Trello allows 100 requests per 10 seconds per token)
+    RATE_LIMIT_REQUESTS = int(os.getenv('TRELLO_RATE_LIMIT_REQUESTS', '100'))
+    RATE_LIMIT_INTERVAL = float(os.getenv('TRELLO_RATE_LIMIT_INTERVAL', '10'))  # Seconds
+    RATE_LIMIT_HEADROOM = float(os.getenv('TRELLO_RATE_LIMIT_HEADROOM', '0.9'))  # Fraction of the limit we allow ourselves
+    MAX_RETRIES = int(os.getenv('TRELLO_MAX_RETRIES', '4'))  # Retries for 429/5xx responses
+    BACKOFF_BASE = float(os.getenv('TRELLO_BACKOFF_BASE', '0.5'))  # Seconds
+    BACKOFF_MAX = float(os.getenv('TRELLO_BACKOFF_MAX', '30'))  # Seconds
+    
+    # Board metadata cache (lists, labels, custom field definitions)
+    METADATA_CACHE_TTL = float(os.getenv('TRELLO_METADATA_CACHE_TTL', '600'))  # Seconds
+    METADATA_CACHE_MAX_BOARDS = int(os.getenv('TRELLO_METADATA_CACHE_MAX_BOARDS', '32'))
+    
+    # Master board view cache; webhooks patch it in place, so this can be long when they are set up
+    VIEW_CACHE_TTL = float(os.getenv('TRELLO_VIEW_CACHE_TTL', '300'))  # Seconds
+    
+    # Sync state (action cursors, card mapping) persisted between runs
+    SYNC_STATE_DB = os.getenv('TRELLO_SYNC_STATE_DB', 'sync_state.db')
+    SYNC_FULL_SCAN_INTERVAL = float(os.getenv('TRELLO_SYNC_FULL_SCAN_INTERVAL', '86400'))  # Seconds between full re-scans
+    SYNC_WRITE_CONCURRENCY = int(os.getenv('TRELLO_SYNC_WRITE_CONCURRENCY', '5'))  # Master cards created in parallel
+    SYNC_LOCK_TTL = float(os.getenv('TRELLO_SYNC_LOCK_TTL', '3600'))  # Seconds before a crashed sync's lock expires
+    # Per-board polling adapts between these bounds to each board's change rate
+    SYNC_POLL_INTERVAL = float(os.getenv('TRELLO_SYNC_POLL_INTERVAL', '900'))  # Seconds, starting point
+    SYNC_POLL_MIN_INTERVAL = float(os.getenv('TRELLO_SYNC_POLL_MIN_INTERVAL', '300'))
+    SYNC_POLL_MAX_INTERVAL = float(os.getenv('TRELLO_SYNC_POLL_MAX_INTERVAL', '3600'))
+    # Partitioned sync: worker processes, and boards split into card shards ("ilitigate_dev=4,design=2")
+    SYNC_PARTITION_WORKERS = int(os.getenv('TRELLO_SYNC_PARTITION_WORKERS', '0'))  # 0 = one per partition
+    SYNC_BOARD_SHARDS = os.getenv('TRELLO_SYNC_BOARD_SHARDS', '')
+    # Apply source-board webhooks to the master board as they arrive; polling drops to a daily consistency check
+    REALTIME_SYNC = os.getenv('TRELLO_REALTIME_SYNC', 'false').lower() == 'true'
+    REALTIME_CONSISTENCY_CHECK_AT = os.getenv('TRELLO_REALTIME_CONSISTENCY_CHECK_AT', '03:00')  # Daily full scan time
+    # Webhook deliveries are queued durably and handled by background workers
+    WEBHOOK_QUEUE_DB = os.getenv('TRELLO_WEBHOOK_QUEUE_DB', 'webhook_queue.db')
+    WEBHOOK_WORKERS = int(os.getenv('TRELLO_WEBHOOK_WORKERS', '2'))
+    # Redelivered actions are dropped by id; each card's events are held this long to put them in order
+    WEBHOOK_DEDUP_TTL = float(os.getenv('TRELLO_WEBHOOK_DEDUP_TTL', '3600'))  # Seconds
+    WEBHOOK_DEDUP_MAX_SIZE = int(os.getenv('TRELLO_WEBHOOK_DEDUP_MAX_SIZE', '10000'))  # Action ids remembered
+    WEBHOOK_REORDER_WINDOW = float(os.getenv('TRELLO_WEBHOOK_REORDER_WINDOW', '0.5'))  # Seconds, 0 = no reordering
+    # A card's update bursts are merged into one net change: released this long after its last event...
+    WEBHOOK_COALESCE_WINDOW = float(os.getenv('TRELLO_WEBHOOK_COALESCE_WINDOW', '1.0'))  # Seconds, 0 = no debounce
+    WEBHOOK_COALESCE_MAX_WAIT = float(os.getenv('TRELLO_WEBHOOK_COALESCE_MAX_WAIT', '5'))  # ...but never held longer than this
+    # /api/stream pushes webhook events to dashboards; a client this many events behind is told to resync
+    STREAM_CLIENT_QUEUE = int(os.getenv('TRELLO_STREAM_CLIENT_QUEUE', '100'))
+    STREAM_HEARTBEAT = float(os.getenv('TRELLO_STREAM_HEARTBEAT', '15'))  # Seconds between keepalives
+    # Every normalized webhook event is kept in a segmented on-disk log (one directory per app) for replay
+    EVENT_LOG = os.getenv('TRELLO_EVENT_LOG', 'true').lower() == 'true'
+    EVENT_LOG_DIR = os.getenv('TRELLO_EVENT_LOG_DIR', 'event_log')
+    EVENT_LOG_SEGMENT_BYTES = int(os.getenv('TRELLO_EVENT_LOG_SEGMENT_BYTES', str(16 * 1024 * 1024)))
+    EVENT_LOG_SEGMENT_SECONDS = float(os.getenv('TRELLO_EVENT_LOG_SEGMENT_SECONDS', '86400'))  # Roll daily at least
+    EVENT_LOG_RETENTION_SECONDS = float(os.getenv('TRELLO_EVENT_LOG_RETENTION_SECONDS', str(30 * 86400)))
+    EVENT_LOG_FSYNC = os.getenv('TRELLO_EVENT_LOG_FSYNC', 'false').lower() == 'true'  # fsync every append
+    # Merge source board cards into the dashboard's master view on read instead of copying them (no sync writes)
+    VIRTUAL_MASTER = os.getenv('TRELLO_VIRTUAL_MASTER', 'false').lower() == 'true'
+    
     @classmethod
     def get_redirect_origins(cls):
         """Get appropriate redirect origins based on environment"""
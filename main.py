@@ -6,7 +6,7 @@ Connects to Trello and analyzes current board setup for software development pro
 
 import os
 from trello_analyzer import TrelloAnalyzer
-from trello_client import TrelloClient
+from trello_client import get_shared_client
 
 def main():
     """Main function to analyze Trello setup"""
@@ -15,7 +15,7 @@ def main():
     try:
         # Initialize analyzer
         analyzer = TrelloAnalyzer()
-        client = TrelloClient()
+        client = get_shared_client()
         
         print("✅ Successfully connected to Trello!")
         
@@ -2,36 +2,104 @@
 """
 Manual Trello Sync
 Run this to manually sync all boards to Master
+
+    python manual_sync.py             # sync now
+    python manual_sync.py --dry-run   # show what a sync would do and cost, change nothing
+    python manual_sync.py --json      # machine-readable plan/result on stdout (logs go to stderr)
 """
 
-from trello_sync import TrelloSync
+import argparse
+import contextlib
+import json
+import sys
+from trello_sync import TrelloSync, SyncPlan
+from trello_sync_state import SyncLock
+from config import TrelloConfig
 from datetime import datetime
 
+def print_plan(plan: SyncPlan):
+    """Human-readable dry-run report"""
+    summary = plan.summary()
+    diff = plan.to_dict()
+    print("\n🧪 Dry run - nothing was changed")
+    print(f"   ➕ Create: {summary['create']} cards")
+    for entry in diff['create']:
+        print(f"      + {entry['name']}")
+    print(f"   ✏️  Update: {summary['update']} cards")
+    for entry in diff['update']:
+        print(f"      ~ {entry['name']}")
+    print(f"   ⏭️  Skip: {summary['skip']} cards")
+    print(f"   👻 Orphaned: {summary['orphan']} master cards without a live source card")
+    for entry in diff['orphan']:
+        print(f"      ? {entry['master_card_id']} (from {entry['source_board']})")
+    print(f"   📡 Requests: {plan.plan_requests} to plan, ~{summary['estimated_requests']} to execute")
+    print(f"   ⏱️  Rate-limit wait: ~{summary['estimated_wait_seconds']}s")
+
 def main():
     """Run manual sync"""
-    print("🔄 Manual Trello Sync")
-    print("=" * 40)
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print()
+    parser = argparse.ArgumentParser(description="Sync all boards to the Master board")
+    parser.add_argument('--dry-run', action='store_true', help="plan the sync and report it without writing anything")
+    parser.add_argument('--json', action='store_true', help="print the plan (or result) as JSON")
+    args = parser.parse_args()
+    
+    # Keep stdout clean for the JSON document
+    log = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    output = None
     
-    try:
-        sync = TrelloSync()
-        result = sync.run_full_sync()
+    with log:
+        print("🔄 Manual Trello Sync")
+        print("=" * 40)
+        print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print()
         
-        if result:
-            print(f"\n🎉 Sync completed successfully!")
-            print(f"   ✅ Synced: {result['synced']} new cards")
-            print(f"   ⏭️  Skipped: {result['skipped']} existing cards")
-            print(f"   📊 Total processed: {result['total']} cards")
-        else:
-            print("\n❌ Sync failed")
+        try:
+            if TrelloConfig.VIRTUAL_MASTER and not args.dry_run:
+                # The dashboard builds the master view from the source boards; copying would only add writes
+                raise RuntimeError("virtual master mode is on (TRELLO_VIRTUAL_MASTER), no cards are copied; "
+                                   "use --dry-run to preview a sync")
+            
+            sync = TrelloSync()
+            lock = SyncLock(sync.state, 'sync')
+            if not args.dry_run and not lock.acquire():
+                raise RuntimeError("another sync is running (auto_sync or real-time); try again shortly")
+            
+            try:
+                plan = sync.plan()
+                result = None if args.dry_run else sync.execute_plan(plan)
+            finally:
+                lock.release()
             
-    except Exception as e:
-        print(f"\n❌ Sync error: {e}")
+            if args.dry_run:
+                output = {'dry_run': True, 'plan': plan.to_dict()}
+                if not args.json:
+                    print_plan(plan)
+            else:
+                # The plan just computed was applied; the boards were not read again
+                output = {'dry_run': False, 'plan': plan.to_dict(), 'result': result}
+                
+                if not args.json:
+                    print(f"\n🎉 Sync completed successfully!")
+                    print(f"   ✅ Synced: {result['synced']} new cards")
+                    print(f"   ⏭️  Skipped: {result['skipped']} existing cards")
+                    if result['failed']:
+                        print(f"   ❌ Failed: {result['failed']} cards")
+                        for failure in result['failures']:
+                            print(f"      - {failure['name']}: {failure['error']}")
+                    print(f"   📊 Total processed: {result['total']} cards")
+                    print(f"   ✏️  Updated: {result['written']} of {result['changed']} changed cards "
+                          f"({result['unchanged']} unchanged)")
+                
+        except Exception as e:
+            print(f"\n❌ Sync error: {e}")
+            output = {'error': str(e)}
+        
+        print(f"\nCompleted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    if args.json:
+        print(json.dumps(output, indent=2, ensure_ascii=False))
     
-    print(f"\nCompleted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    if output is None or 'error' in output:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
-
-
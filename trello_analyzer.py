@@ -1,7 +1,10 @@
-from typing import List, Dict, Optional
-from trello_client import TrelloClient
+from typing import List, Dict, Optional, Iterable
+from trello_client import get_shared_client, BoardSnapshot
+from trello_async_client import AsyncTrelloClient
+from trello_fields import FieldProjection
 from dataclasses import dataclass
 from datetime import datetime
+import asyncio
 
 @dataclass
 class BoardAnalysis:
@@ -19,50 +22,88 @@ class TrelloAnalyzer:
     """Analyzer for Trello boards to understand current setup and structure"""
     
     def __init__(self):
-        self.client = TrelloClient()
+        self.client = get_shared_client()
     
-    def analyze_board(self, board_id: str) -> BoardAnalysis:
-        """Analyze a specific board and return detailed information"""
-        board = self.client.get_board(board_id)
-        lists = self.client.get_board_lists(board_id)
-        cards = self.client.get_board_cards(board_id)
-        labels = self.client.get_board_labels(board_id)
-        
-        # Group cards by list
-        cards_by_list = {}
-        for list_item in lists:
-            list_cards = [card for card in cards if card['idList'] == list_item['id']]
-            cards_by_list[list_item['name']] = list_cards
+    # Nested resources an analysis needs, fetched with the board in one request
+    SNAPSHOT_INCLUDE = ('lists', 'cards', 'card_members', 'labels')
+    
+    # Card attributes the analysis reads, used when streaming large boards
+    STREAMED_CARD_PROJECTION = FieldProjection(card=('name', 'desc', 'idList', 'closed'), member=('id',))
+    
+    def analyze_board(self, board_id: str, stream_cards: bool = False) -> BoardAnalysis:
+        """Analyze a specific board and return detailed information
+        
+        stream_cards processes cards as they are decoded from the response instead of
+        loading the whole card list first; use it for boards with thousands of cards.
+        """
+        if stream_cards:
+            snapshot = self.client.get_board_snapshot(board_id, include=('lists', 'labels'))
+            cards = self.client.iter_board_cards(board_id, projection=self.STREAMED_CARD_PROJECTION)
+            return self._build_analysis(snapshot, cards)
+        
+        snapshot = self.client.get_board_snapshot(board_id, include=self.SNAPSHOT_INCLUDE)
+        return self._build_analysis(snapshot)
+    
+    async def analyze_board_async(self, client: AsyncTrelloClient, board_id: str) -> BoardAnalysis:
+        """Analyze a board using the async client"""
+        snapshot = await client.get_board_snapshot(board_id, include=self.SNAPSHOT_INCLUDE)
+        return self._build_analysis(snapshot)
+    
+    def _build_analysis(self, snapshot: BoardSnapshot, cards: Optional[Iterable[Dict]] = None) -> BoardAnalysis:
+        """Group a board's cards by list and compute its summary
+        
+        cards defaults to the snapshot's cards; any iterable (e.g. a stream) is consumed once.
+        """
+        lists = snapshot.lists
+        if cards is None:
+            cards = snapshot.cards
+        
+        # Group cards by list in a single pass
+        cards_by_list = {list_item['name']: [] for list_item in lists}
+        list_names = {list_item['id']: list_item['name'] for list_item in lists}
+        total_cards = 0
+        for card in cards:
+            total_cards += 1
+            list_name = list_names.get(card['idList'])
+            if list_name is not None:
+                cards_by_list[list_name].append(card)
         
         # Calculate completion rate if there are "Done" or "Completed" lists
         completion_rate = self._calculate_completion_rate(lists, cards_by_list)
         
         return BoardAnalysis(
-            board_id=board_id,
-            board_name=board['name'],
-            total_cards=len(cards),
+            board_id=snapshot.board_id,
+            board_name=snapshot.board['name'],
+            total_cards=total_cards,
             total_lists=len(lists),
             lists=lists,
             cards_by_list=cards_by_list,
-            labels=labels,
+            labels=snapshot.labels,
             completion_rate=completion_rate
         )
     
     def analyze_all_boards(self) -> List[BoardAnalysis]:
         """Analyze all boards for the authenticated user"""
         boards = self.client.get_boards()
+        results = asyncio.run(self._analyze_boards_concurrently(boards))
         analyses = []
         
-        for board in boards:
-            try:
-                analysis = self.analyze_board(board['id'])
-                analyses.append(analysis)
-            except Exception as e:
-                print(f"Error analyzing board {board['name']}: {e}")
+        for board, result in zip(boards, results):
+            if isinstance(result, Exception):
+                print(f"Error analyzing board {board['name']}: {result}")
                 continue
+            analyses.append(result)
         
         return analyses
     
+    async def _analyze_boards_concurrently(self, boards: List[Dict]) -> List:
+        """Analyze every board at once; failures are returned in place"""
+        async with AsyncTrelloClient() as client:
+            return await asyncio.gather(
+                *(self.analyze_board_async(client, board['id']) for board in boards),
+                return_exceptions=True
+            )
+    
     def _calculate_completion_rate(self, lists: List[Dict], cards_by_list: Dict[str, List[Dict]]) -> Optional[float]:
         """Calculate completion rate based on cards in 'Done' or 'Completed' lists"""
         done_lists = [lst for lst in lists if any(keyword in lst['name'].lower() 
@@ -5,7 +5,9 @@ Handles all frontend-to-Trello operations (create, update, move cards)
 """
 
 from flask import Flask, request, jsonify
-from trello_client import TrelloClient
+from trello_client import get_shared_client
+from trello_cache import get_metadata_cache
+from config import TrelloConfig
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -18,7 +20,8 @@ class TrelloAPIService:
     """Service for handling frontend-to-Trello operations"""
     
     def __init__(self):
-        self.client = TrelloClient()
+        self.client = get_shared_client()
+        self.metadata = get_metadata_cache()
         
         # Board IDs for your 6-board structure
         self.boards = {
@@ -85,7 +88,8 @@ class TrelloAPIService:
                 self._add_member_to_card(card['id'], task_data['assignee'])
             
             # If this is a master task, also create on master board
-            if board_id != self.boards['master']:
+            # (the virtual master view already merges source cards in)
+            if board_id != self.boards['master'] and not TrelloConfig.VIRTUAL_MASTER:
                 self._sync_to_master_board(card, task_data)
             
             logger.info(f"Created task: {card['name']} on board {board_id}")
@@ -150,7 +154,7 @@ class TrelloAPIService:
                 target_list_id = self._get_list_id_by_name(target_board_id, target_list)
             else:
                 # Get the first list (usually "To Do" or similar)
-                lists = self.client.get_board_lists(target_board_id)
+                lists = self.metadata.get_lists(target_board_id)
                 target_list_id = lists[0]['id'] if lists else None
             
             if not target_list_id:
@@ -208,7 +212,7 @@ class TrelloAPIService:
                 'Project': deliverable_data.get('project', ''),
                 'Priority': deliverable_data.get('priority', 'Medium'),
                 'Status': 'Not Started'
-            })
+            }, board_id=board_id)
             
             logger.info(f"Created deliverable: {card['name']}")
             
@@ -243,16 +247,12 @@ class TrelloAPIService:
             return self._get_list_id_by_name(board_id, self.weekly_columns[day])
         
         # For other boards, use the first list (usually "To Do")
-        lists = self.client.get_board_lists(board_id)
+        lists = self.metadata.get_lists(board_id)
         return lists[0]['id'] if lists else None
     
     def _get_list_id_by_name(self, board_id: str, list_name: str) -> Optional[str]:
         """Get list ID by name"""
-        lists = self.client.get_board_lists(board_id)
-        for list_item in lists:
-            if list_item['name'] == list_name:
-                return list_item['id']
-        return None
+        return self.metadata.get_list_id(board_id, list_name)
     
     def _add_labels_to_card(self, card_id: str, task_data: Dict[str, Any]):
         """Add labels to a card"""
@@ -299,13 +299,10 @@ class TrelloAPIService:
     def _get_or_create_label(self, board_id: str, label_name: str) -> Optional[Dict]:
         """Get existing label or create new one"""
         try:
-            # Get existing labels
-            labels = self.client._make_request(f'boards/{board_id}/labels')
-            
             # Check if label exists
-            for label in labels:
-                if label['name'] == label_name:
-                    return label
+            label = self.metadata.get_label(board_id, label_name)
+            if label:
+                return label
             
             # Create new label
             label_data = {'name': label_name, 'color': 'blue'}
@@ -314,6 +311,7 @@ class TrelloAPIService:
                 method='POST',
                 data=label_data
             )
+            self.metadata.add_label(board_id, new_label)
             
             return new_label
             
@@ -330,15 +328,16 @@ class TrelloAPIService:
         except Exception as e:
             logger.warning(f"Failed to add member to card: {e}")
     
-    def _set_custom_field_values(self, card_id: str, field_values: Dict[str, str]):
-        """Set custom field values on a card"""
+    def _set_custom_field_values(self, card_id: str, field_values: Dict[str, str], board_id: Optional[str] = None):
+        """Set custom field values on a card
+        
+        Pass board_id when known; otherwise the card is fetched to find its board.
+        """
         try:
-            # Get the board ID from the card
-            card = self.client._make_request(f'cards/{card_id}')
-            board_id = card['idBoard']
-            
-            # Get all custom fields for the board
-            custom_fields = self.client._make_request(f'boards/{board_id}/customFields')
+            if not board_id:
+                # Get the board ID from the card
+                card = self.client._make_request(f'cards/{card_id}', params={'fields': 'idBoard'})
+                board_id = card['idBoard']
             
             # Set each custom field value
             for field_name, field_value in field_values.items():
@@ -346,13 +345,17 @@ class TrelloAPIService:
                     continue
                     
                 # Find the custom field by name
-                custom_field = next((cf for cf in custom_fields if cf['name'] == field_name), None)
+                custom_field = self.metadata.get_custom_field(board_id, field_name)
                 
                 if custom_field:
-                    # Set the custom field value
-                    field_data = {
-                        'value': {'text': field_value}
-                    }
+                    # Dropdown fields take an option ID; others take a text value
+                    option_id = self.metadata.get_custom_field_option_id(board_id, field_name, field_value)
+                    if option_id:
+                        field_data = {'idValue': option_id}
+                    else:
+                        field_data = {
+                            'value': {'text': field_value}
+                        }
                     
                     self.client._make_request(
                         f'cards/{card_id}/customField/{custom_field["id"]}/item',
@@ -396,7 +399,7 @@ class TrelloAPIService:
                     'Project': task_data.get('project', ''),
                     'Priority': task_data.get('priority', 'Medium'),
                     'Status': 'Not Started'
-                })
+                }, board_id=self.boards['master'])
                 
                 logger.info(f"Synced card to master board: {master_card['name']}")
                 
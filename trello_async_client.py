@@ -0,0 +1,201 @@
+import asyncio
+import aiohttp
+from typing import List, Dict, Optional, Any, Iterable, Union
+from config import TrelloConfig
+from trello_fields import FieldProjection
+from trello_client import BoardSnapshot, build_snapshot_params
+from trello_rate_limit import TokenBucketScheduler, get_shared_scheduler, should_retry
+
+class AsyncTrelloClient:
+    """Asyncio client for the Trello API with the same surface as TrelloClient"""
+    
+    BASE_URL = "https://api.trello.com/1"
+    
+    def __init__(self, max_concurrency: int = None, pool_maxsize: int = None, keep_alive_timeout: float = None,
+                 scheduler: Optional[TokenBucketScheduler] = None, max_retries: int = None):
+        TrelloConfig.validate()
+        self.api_key = TrelloConfig.API_KEY
+        self.token = TrelloConfig.TOKEN
+        self.auth_params = {
+            'key': self.api_key,
+            'token': self.token
+        }
+        self.max_concurrency = max_concurrency or TrelloConfig.ASYNC_MAX_CONCURRENCY
+        self.pool_maxsize = pool_maxsize or TrelloConfig.HTTP_POOL_MAXSIZE
+        self.keep_alive_timeout = keep_alive_timeout or TrelloConfig.HTTP_KEEP_ALIVE_TIMEOUT
+        self.timeout = TrelloConfig.HTTP_TIMEOUT
+        self.scheduler = scheduler or get_shared_scheduler()
+        self.max_retries = max_retries if max_retries is not None else TrelloConfig.MAX_RETRIES
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session lazily so it binds to the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+                keepalive_timeout=self.keep_alive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            # Bound in-flight requests so concurrent fan-out stays inside Trello's rate limits
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    async def close(self):
+        """Close the session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _make_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
+        """Make a request to the Trello API"""
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
+        url = f"{self.BASE_URL}/{endpoint}"
+        request_params = {k: v for k, v in self.auth_params.items() if v is not None}
+        
+        # Add any additional parameters
+        if params:
+            request_params.update({k: str(v) for k, v in params.items()})
+        
+        session = self._get_session()
+        json_body = data if method in ('POST', 'PUT') else None
+        
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                # Pace requests so bursts stay under Trello's rate limit
+                await self.scheduler.acquire_async()
+                async with session.request(method, url, params=request_params, json=json_body) as response:
+                    self.scheduler.update_from_headers(response.headers)
+                    
+                    if attempt < self.max_retries and should_retry(method, response.status):
+                        delay = self.scheduler.backoff_delay(attempt, response.headers.get('Retry-After'))
+                        self.scheduler.record_retry(response.status, delay)
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(delay)
+    
+    def get_rate_limit_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throttle wait time and retry counters from the scheduler"""
+        return self.scheduler.get_metrics()
+    
+    async def get_boards(self) -> List[Dict]:
+        """Get all boards for the authenticated user"""
+        return await self._make_request('members/me/boards')
+    
+    async def get_board(self, board_id: str) -> Dict:
+        """Get a specific board by ID"""
+        return await self._make_request(f'boards/{board_id}')
+    
+    async def get_board_snapshot(self, board_id: str, include: Optional[Iterable[str]] = None,
+                                 fields: Optional[Union[FieldProjection, Dict[str, List[str]]]] = None) -> BoardSnapshot:
+        """Get a board with its nested resources in one request (see TrelloClient.get_board_snapshot)"""
+        params = build_snapshot_params(include, fields)
+        return BoardSnapshot.from_response(board_id, await self._make_request(f'boards/{board_id}', params=params))
+    
+    async def get_board_lists(self, board_id: str) -> List[Dict]:
+        """Get all lists for a specific board"""
+        return await self._make_request(f'boards/{board_id}/lists')
+    
+    async def get_board_cards(self, board_id: str, projection: Optional[FieldProjection] = None) -> List[Dict]:
+        """Get all cards for a specific board, optionally trimmed to a field projection"""
+        params = {'members': 'true'}
+        if projection:
+            params.update(projection.to_card_params())
+        return await self._make_request(f'boards/{board_id}/cards', params=params)
+    
+    async def get_list_cards(self, list_id: str, projection: Optional[FieldProjection] = None) -> List[Dict]:
+        """Get all cards for a specific list, optionally trimmed to a field projection"""
+        params = projection.to_card_params() if projection else None
+        return await self._make_request(f'lists/{list_id}/cards', params=params)
+    
+    async def create_board(self, name: str, desc: str = "", default_lists: bool = True, org_id: str = None) -> Dict:
+        """Create a new board"""
+        data = {
+            'name': name,
+            'desc': desc,
+            'defaultLists': default_lists
+        }
+        if org_id:
+            data['idOrganization'] = org_id
+        return await self._make_request('boards', method='POST', data=data)
+    
+    async def create_list(self, board_id: str, name: str, pos: str = "bottom") -> Dict:
+        """Create a new list on a board"""
+        data = {
+            'name': name,
+            'idBoard': board_id,
+            'pos': pos
+        }
+        return await self._make_request('lists', method='POST', data=data)
+    
+    async def create_card(self, list_id: str, name: str, desc: str = "", labels: List[str] = None,
+                    pos: Optional[Union[float, str]] = None) -> Dict:
+        """Create a new card in a list (at the bottom unless pos is given)"""
+        data = {
+            'name': name,
+            'desc': desc,
+            'idList': list_id
+        }
+        if labels:
+            data['idLabels'] = ','.join(labels)
+        if pos is not None:
+            data['pos'] = pos
+        return await self._make_request('cards', method='POST', data=data)
+    
+    async def get_board_labels(self, board_id: str) -> List[Dict]:
+        """Get all labels for a specific board"""
+        return await self._make_request(f'boards/{board_id}/labels')
+    
+    async def create_label(self, board_id: str, name: str, color: str = "blue") -> Dict:
+        """Create a new label on a board"""
+        data = {
+            'name': name,
+            'color': color,
+            'idBoard': board_id
+        }
+        return await self._make_request('labels', method='POST', data=data)
+    
+    async def add_label_to_card(self, card_id: str, label_name: str) -> bool:
+        """Add a label to a card by name"""
+        try:
+            # First, get the board ID from the card
+            card = await self._make_request(f'cards/{card_id}')
+            board_id = card['idBoard']
+            
+            # Get all labels for the board
+            labels = await self._make_request(f'boards/{board_id}/labels')
+            
+            # Find the label by name
+            label = next((lbl for lbl in labels if lbl['name'] == label_name), None)
+            
+            if label:
+                # Add the label to the card
+                await self._make_request(
+                    f'cards/{card_id}/idLabels',
+                    method='POST',
+                    data={'value': label['id']}
+                )
+                return True
+            else:
+                print(f"Label '{label_name}' not found on board")
+                return False
+                
+        except Exception as e:
+            print(f"Error adding label '{label_name}' to card {card_id}: {e}")
+            return False
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
+from config import TrelloConfig
+from trello_client import TrelloClient, get_shared_client
+
+@dataclass
+class BoardMetadata:
+    """A board's lists, labels and custom field definitions with name→id indexes"""
+    board_id: str
+    lists: List[Dict]
+    labels: List[Dict]
+    custom_fields: List[Dict]
+    fetched_at: float = field(default_factory=time.monotonic)
+    list_ids_by_name: Dict[str, str] = field(default_factory=dict)
+    labels_by_name: Dict[str, Dict] = field(default_factory=dict)
+    custom_fields_by_name: Dict[str, Dict] = field(default_factory=dict)
+    option_ids_by_field: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        self.reindex()
+    
+    def reindex(self):
+        """Rebuild the name indexes after the underlying data changed"""
+        # First match wins, matching the linear scans this cache replaces
+        self.list_ids_by_name = {}
+        for list_item in self.lists:
+            self.list_ids_by_name.setdefault(list_item['name'], list_item['id'])
+        
+        self.labels_by_name = {}
+        for label in self.labels:
+            self.labels_by_name.setdefault(label.get('name', ''), label)
+        
+        self.custom_fields_by_name = {}
+        self.option_ids_by_field = {}
+        for custom_field in self.custom_fields:
+            self.custom_fields_by_name.setdefault(custom_field['name'], custom_field)
+            self.option_ids_by_field.setdefault(custom_field['name'], {
+                option['value']['text']: option['id'] for option in custom_field.get('options', [])
+            })
+
+class MetadataCache:
+    """Process-wide TTL+LRU cache of board metadata, loaded one snapshot per board"""
+    
+    # Board actions that change lists, labels or custom field definitions
+    METADATA_ACTION_TYPES = {
+        'createList', 'updateList', 'moveListToBoard', 'moveListFromBoard',
+        'createLabel', 'updateLabel', 'deleteLabel',
+        'createCustomField', 'updateCustomField', 'deleteCustomField'
+    }
+    
+    def __init__(self, client: TrelloClient = None, ttl: float = None, max_boards: int = None):
+        self.client = client or get_shared_client()
+        self.ttl = ttl if ttl is not None else TrelloConfig.METADATA_CACHE_TTL
+        self.max_boards = max_boards or TrelloConfig.METADATA_CACHE_MAX_BOARDS
+        self._entries: 'OrderedDict[str, BoardMetadata]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, board_id: str) -> BoardMetadata:
+        """Get a board's metadata, loading it if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(board_id)
+            if entry and time.monotonic() - entry.fetched_at < self.ttl:
+                self._entries.move_to_end(board_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        # Load outside the lock so one slow board does not block the others
+        entry = self._load(board_id)
+        
+        with self._lock:
+            self._entries[board_id] = entry
+            self._entries.move_to_end(board_id)
+            while len(self._entries) > self.max_boards:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+    
+    def _load(self, board_id: str) -> BoardMetadata:
+        """Fetch lists, labels and custom fields for a board in one request"""
+        snapshot = self.client.get_board_snapshot(
+            board_id,
+            include=('lists', 'labels', 'custom_fields'),
+            fields={'board': ['id']}
+        )
+        return BoardMetadata(
+            board_id=board_id,
+            lists=snapshot.lists,
+            labels=snapshot.labels,
+            custom_fields=snapshot.custom_fields
+        )
+    
+    def get_lists(self, board_id: str) -> List[Dict]:
+        """Open lists on a board, in board order"""
+        return self.get(board_id).lists
+    
+    def get_list_id(self, board_id: str, list_name: str) -> Optional[str]:
+        """List ID by exact name"""
+        return self.get(board_id).list_ids_by_name.get(list_name)
+    
+    def get_labels(self, board_id: str) -> List[Dict]:
+        """All labels on a board"""
+        return self.get(board_id).labels
+    
+    def get_label(self, board_id: str, label_name: str) -> Optional[Dict]:
+        """Label by exact name"""
+        return self.get(board_id).labels_by_name.get(label_name)
+    
+    def get_custom_fields(self, board_id: str) -> List[Dict]:
+        """Custom field definitions on a board"""
+        return self.get(board_id).custom_fields
+    
+    def get_custom_field(self, board_id: str, field_name: str) -> Optional[Dict]:
+        """Custom field definition by name"""
+        return self.get(board_id).custom_fields_by_name.get(field_name)
+    
+    def get_custom_field_option_id(self, board_id: str, field_name: str, option_text: str) -> Optional[str]:
+        """Dropdown option ID for a custom field by its display text"""
+        return self.get(board_id).option_ids_by_field.get(field_name, {}).get(option_text)
+    
+    def add_label(self, board_id: str, label: Dict):
+        """Record a label we just created so the next lookup does not refetch"""
+        with self._lock:
+            entry = self._entries.get(board_id)
+            if entry:
+                entry.labels.append(label)
+                entry.reindex()
+    
+    def invalidate(self, board_id: str):
+        """Drop a board's metadata so the next lookup refetches it"""
+        with self._lock:
+            if self._entries.pop(board_id, None) is not None:
+                self.invalidations += 1
+    
+    def invalidate_all(self):
+        """Drop every cached board"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+    
+    def handle_webhook_event(self, event: Dict):
+        """Webhook listener: drop a board's metadata when its lists, labels or custom fields change"""
+        if event.get('action_type') in self.METADATA_ACTION_TYPES and event.get('board_id'):
+            self.invalidate(event['board_id'])
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Hit, miss, eviction and invalidation counters"""
+        with self._lock:
+            return {
+                'boards': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+# Process-wide cache shared by every service
+_metadata_cache: Optional[MetadataCache] = None
+_metadata_cache_lock = threading.Lock()
+
+def get_metadata_cache() -> MetadataCache:
+    """Get the process-wide MetadataCache, creating it on first use"""
+    global _metadata_cache
+    if _metadata_cache is None:
+        with _metadata_cache_lock:
+            if _metadata_cache is None:
+                _metadata_cache = MetadataCache()
+    return _metadata_cache
@@ -1,13 +1,106 @@
+import threading
+import time
 import requests
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Callable, Any, Iterable, Iterator, Union
 from config import TrelloConfig
+from trello_fields import FieldProjection
+from trello_json_stream import iter_json_array
+from trello_rate_limit import TokenBucketScheduler, get_shared_scheduler, should_retry
+
+@dataclass
+class BatchResult:
+    """Result for one route of a Trello /batch call"""
+    route: str
+    status_code: int
+    data: Any = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status_code < 300
+
+@dataclass
+class BoardSnapshot:
+    """A board with its nested resources, fetched in a single request"""
+    board_id: str
+    board: Dict
+    lists: List[Dict] = field(default_factory=list)
+    cards: List[Dict] = field(default_factory=list)
+    labels: List[Dict] = field(default_factory=list)
+    custom_fields: List[Dict] = field(default_factory=list)
+    members: List[Dict] = field(default_factory=list)
+    
+    @classmethod
+    def from_response(cls, board_id: str, data: Dict) -> 'BoardSnapshot':
+        """Split a nested board response into its resources"""
+        board = {key: value for key, value in data.items() if key not in SNAPSHOT_NESTED_KEYS}
+        return cls(
+            board_id=board_id,
+            board=board,
+            lists=data.get('lists', []),
+            cards=data.get('cards', []),
+            labels=data.get('labels', []),
+            custom_fields=data.get('customFields', []),
+            members=data.get('members', [])
+        )
+    
+    def get_list(self, list_id: str) -> Optional[Dict]:
+        """Find a list by ID"""
+        return next((lst for lst in self.lists if lst['id'] == list_id), None)
+
+# Resources get_board_snapshot can nest, and the query params that request them
+SNAPSHOT_INCLUDE_PARAMS = {
+    'cards': {'cards': 'open'},
+    'card_custom_fields': {'card_customFieldItems': 'true'},
+    'card_members': {'card_members': 'true'},
+    'lists': {'lists': 'open'},
+    'labels': {'labels': 'all'},
+    'custom_fields': {'customFields': 'true'},
+    'members': {'members': 'all'}
+}
+SNAPSHOT_NESTED_KEYS = {'cards', 'lists', 'labels', 'customFields', 'members'}
+
+# Field-selection keys and the Trello param each maps to
+SNAPSHOT_FIELD_PARAMS = {
+    'board': 'fields',
+    'card': 'card_fields',
+    'list': 'list_fields',
+    'label': 'label_fields',
+    'member': 'member_fields'
+}
+
+def build_snapshot_params(include: Optional[Iterable[str]] = None,
+                          fields: Optional[Union[FieldProjection, Dict[str, List[str]]]] = None) -> Dict[str, str]:
+    """Translate include/fields arguments into Trello nested-resource query params"""
+    if isinstance(fields, FieldProjection):
+        fields = fields.to_snapshot_fields()
+    include = SNAPSHOT_INCLUDE_PARAMS.keys() if include is None else include
+    params = {}
+    for resource in include:
+        if resource not in SNAPSHOT_INCLUDE_PARAMS:
+            raise ValueError(f"Unknown snapshot resource: {resource}")
+        params.update(SNAPSHOT_INCLUDE_PARAMS[resource])
+    
+    for resource, names in (fields or {}).items():
+        if resource not in SNAPSHOT_FIELD_PARAMS:
+            raise ValueError(f"Unknown snapshot field group: {resource}")
+        params[SNAPSHOT_FIELD_PARAMS[resource]] = ','.join(names)
+    return params
 
 class TrelloClient:
     """Client for interacting with Trello API"""
     
     BASE_URL = "https://api.trello.com/1"
+    BATCH_MAX_ROUTES = 10  # Trello's limit per /batch call
+    STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when streaming large responses
     
-    def __init__(self):
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None,
+                 pool_block: bool = None, keep_alive: bool = None,
+                 stats_hook: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 scheduler: Optional[TokenBucketScheduler] = None, max_retries: int = None):
         TrelloConfig.validate()
         self.api_key = TrelloConfig.API_KEY
         self.token = TrelloConfig.TOKEN
@@ -15,9 +108,42 @@ class TrelloClient:
             'key': self.api_key,
             'token': self.token
         }
+        self.timeout = TrelloConfig.HTTP_TIMEOUT
+        self.stats_hook = stats_hook
+        self.scheduler = scheduler or get_shared_scheduler()
+        self.max_retries = max_retries if max_retries is not None else TrelloConfig.MAX_RETRIES
+        self._request_count = 0
+        self._stats_lock = threading.Lock()
+        self.pool_maxsize = pool_maxsize if pool_maxsize is not None else TrelloConfig.HTTP_POOL_MAXSIZE
+        self.session = self._create_session(
+            pool_connections if pool_connections is not None else TrelloConfig.HTTP_POOL_CONNECTIONS,
+            self.pool_maxsize,
+            pool_block if pool_block is not None else TrelloConfig.HTTP_POOL_BLOCK,
+            keep_alive if keep_alive is not None else TrelloConfig.HTTP_KEEP_ALIVE
+        )
+    
+    def _create_session(self, pool_connections: int, pool_maxsize: int, pool_block: bool, keep_alive: bool) -> requests.Session:
+        """Create a pooled session so repeated calls reuse TCP+TLS connections"""
+        session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
+        session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        return session
     
     def _make_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict:
         """Make a request to the Trello API"""
+        response = self._request_with_retries(endpoint, method, data, params)
+        response.raise_for_status()
+        return response.json()
+    
+    def _request_with_retries(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None,
+                              params: Optional[Dict] = None, stream: bool = False) -> requests.Response:
+        """Send a paced request, retrying 429/5xx with backoff; returns the final response"""
         url = f"{self.BASE_URL}/{endpoint}"
         request_params = self.auth_params.copy()
         
@@ -25,19 +151,126 @@ class TrelloClient:
         if params:
             request_params.update(params)
         
-        if method == 'GET':
-            response = requests.get(url, params=request_params)
-        elif method == 'POST':
-            response = requests.post(url, params=request_params, json=data)
-        elif method == 'PUT':
-            response = requests.put(url, params=request_params, json=data)
-        elif method == 'DELETE':
-            response = requests.delete(url, params=request_params)
-        else:
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
             raise ValueError(f"Unsupported HTTP method: {method}")
         
-        response.raise_for_status()
-        return response.json()
+        for attempt in range(self.max_retries + 1):
+            # Pace requests so bursts stay under Trello's rate limit
+            self.scheduler.acquire()
+            response = self._send(method, url, request_params, data, stream)
+            self.scheduler.update_from_headers(response.headers)
+            
+            if attempt < self.max_retries and should_retry(method, response.status_code):
+                delay = self.scheduler.backoff_delay(attempt, response.headers.get('Retry-After'))
+                self.scheduler.record_retry(response.status_code, delay)
+                # Release the connection back to the pool before retrying
+                response.close()
+                time.sleep(delay)
+                continue
+            break
+        
+        return response
+    
+    def _send(self, method: str, url: str, request_params: Dict, data: Optional[Dict], stream: bool = False) -> requests.Response:
+        """Send a single HTTP request over the pooled session"""
+        json_body = data if method in ('POST', 'PUT') else None
+        response = self.session.request(method, url, params=request_params, json=json_body,
+                                        timeout=self.timeout, stream=stream)
+        
+        with self._stats_lock:
+            self._request_count += 1
+        if self.stats_hook:
+            self.stats_hook(self.get_connection_stats())
+        
+        return response
+    
+    def _iter_request(self, endpoint: str, params: Optional[Dict] = None) -> Iterator[Dict]:
+        """GET a JSON array and yield its elements as they are decoded from the stream"""
+        response = self._request_with_retries(endpoint, params=params, stream=True)
+        with response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE))
+    
+    def batch_get(self, urls: List[str]) -> List[BatchResult]:
+        """GET many routes through Trello's /batch endpoint, returned in input order
+        
+        Routes are relative to the API root (e.g. '/cards/{id}/customFieldItems') and
+        must not contain commas. They are packed 10 per call and chunks run in parallel.
+        """
+        routes = [url if url.startswith('/') else f'/{url}' for url in urls]
+        chunks = [routes[i:i + self.BATCH_MAX_ROUTES] for i in range(0, len(routes), self.BATCH_MAX_ROUTES)]
+        
+        if len(chunks) <= 1:
+            chunk_results = [self._batch_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), self.pool_maxsize)) as executor:
+                chunk_results = list(executor.map(self._batch_chunk, chunks))
+        
+        return [result for chunk in chunk_results for result in chunk]
+    
+    def _batch_chunk(self, routes: List[str]) -> List[BatchResult]:
+        """Run one /batch call and demultiplex its per-route responses"""
+        try:
+            items = self._make_request('batch', params={'urls': ','.join(routes)})
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 500
+            return [BatchResult(route=route, status_code=status, error=str(e)) for route in routes]
+        except Exception as e:
+            return [BatchResult(route=route, status_code=0, error=str(e)) for route in routes]
+        
+        results = []
+        for route, item in zip(routes, items):
+            results.append(self._parse_batch_item(route, item))
+        
+        # Trello should answer every route; treat anything missing as an error
+        for route in routes[len(items):]:
+            results.append(BatchResult(route=route, status_code=0, error='No response for route'))
+        return results
+    
+    def _parse_batch_item(self, route: str, item: Any) -> BatchResult:
+        """Successful items look like {"200": data}; failures carry statusCode/message"""
+        if isinstance(item, dict) and len(item) == 1:
+            key = next(iter(item))
+            if key.isdigit():
+                status = int(key)
+                if 200 <= status < 300:
+                    return BatchResult(route=route, status_code=status, data=item[key])
+                return BatchResult(route=route, status_code=status, error=str(item[key]))
+        
+        if isinstance(item, dict):
+            status = item.get('statusCode', 500)
+            message = item.get('message') or item.get('name') or 'Unknown error'
+            return BatchResult(route=route, status_code=status, error=message)
+        
+        return BatchResult(route=route, status_code=0, error=f'Unexpected batch item: {item!r}')
+    
+    def get_rate_limit_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throttle wait time and retry counters from the scheduler"""
+        return self.scheduler.get_metrics()
+    
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Report how many requests were served over reused connections"""
+        opened = 0
+        pooled_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            pooled_requests += pool.num_requests
+        
+        reused = max(pooled_requests - opened, 0)
+        return {
+            'requests': self._request_count,
+            'connections_opened': opened,
+            'connections_reused': reused,
+            'reuse_ratio': (reused / pooled_requests) if pooled_requests else 0.0
+        }
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
     
     def get_boards(self) -> List[Dict]:
         """Get all boards for the authenticated user"""
@@ -47,17 +280,55 @@ class TrelloClient:
         """Get a specific board by ID"""
         return self._make_request(f'boards/{board_id}')
     
+    def get_board_snapshot(self, board_id: str, include: Optional[Iterable[str]] = None,
+                           fields: Optional[Union[FieldProjection, Dict[str, List[str]]]] = None) -> BoardSnapshot:
+        """Get a board with its cards, lists, labels, custom fields and members in one request
+        
+        include picks nested resources (default: all of SNAPSHOT_INCLUDE_PARAMS); fields is a
+        FieldProjection (or a dict mapping 'board'/'card'/'list'/'label'/'member' to attribute
+        names) that trims the payload to what the caller reads.
+        """
+        params = build_snapshot_params(include, fields)
+        return BoardSnapshot.from_response(board_id, self._make_request(f'boards/{board_id}', params=params))
+    
     def get_board_lists(self, board_id: str) -> List[Dict]:
         """Get all lists for a specific board"""
         return self._make_request(f'boards/{board_id}/lists')
     
-    def get_board_cards(self, board_id: str) -> List[Dict]:
-        """Get all cards for a specific board"""
-        return self._make_request(f'boards/{board_id}/cards', params={'members': 'true'})
+    def get_board_cards(self, board_id: str, projection: Optional[FieldProjection] = None) -> List[Dict]:
+        """Get all cards for a specific board, optionally trimmed to a field projection"""
+        params = {'members': 'true'}
+        if projection:
+            params.update(projection.to_card_params())
+        return self._make_request(f'boards/{board_id}/cards', params=params)
     
-    def get_list_cards(self, list_id: str) -> List[Dict]:
-        """Get all cards for a specific list"""
-        return self._make_request(f'lists/{list_id}/cards')
+    def iter_board_cards(self, board_id: str, projection: Optional[FieldProjection] = None) -> Iterator[Dict]:
+        """Yield a board's cards one at a time while the response is still downloading
+        
+        Memory stays flat for boards with thousands of cards; the connection is held
+        until the iterator is exhausted or closed.
+        """
+        params = {'members': 'true'}
+        if projection:
+            params.update(projection.to_card_params())
+        return self._iter_request(f'boards/{board_id}/cards', params=params)
+    
+    def get_board_actions(self, board_id: str, since: Optional[str] = None, action_filter: Optional[str] = None,
+                          limit: int = 1000, fields: Optional[str] = None) -> List[Dict]:
+        """Get a board's actions, newest first, optionally only those after an action id/date"""
+        params = {'limit': str(limit)}
+        if since:
+            params['since'] = since
+        if action_filter:
+            params['filter'] = action_filter
+        if fields:
+            params['fields'] = fields
+        return self._make_request(f'boards/{board_id}/actions', params=params)
+    
+    def get_list_cards(self, list_id: str, projection: Optional[FieldProjection] = None) -> List[Dict]:
+        """Get all cards for a specific list, optionally trimmed to a field projection"""
+        params = projection.to_card_params() if projection else None
+        return self._make_request(f'lists/{list_id}/cards', params=params)
     
     def create_board(self, name: str, desc: str = "", default_lists: bool = True, org_id: str = None) -> Dict:
         """Create a new board"""
@@ -79,8 +350,9 @@ class TrelloClient:
         }
         return self._make_request('lists', method='POST', data=data)
     
-    def create_card(self, list_id: str, name: str, desc: str = "", labels: List[str] = None) -> Dict:
-        """Create a new card in a list"""
+    def create_card(self, list_id: str, name: str, desc: str = "", labels: List[str] = None,
+                    pos: Optional[Union[float, str]] = None) -> Dict:
+        """Create a new card in a list (at the bottom unless pos is given)"""
         data = {
             'name': name,
             'desc': desc,
@@ -88,6 +360,8 @@ class TrelloClient:
         }
         if labels:
             data['idLabels'] = ','.join(labels)
+        if pos is not None:
+            data['pos'] = pos
         return self._make_request('cards', method='POST', data=data)
     
     def get_board_labels(self, board_id: str) -> List[Dict]:
@@ -133,3 +407,24 @@ class TrelloClient:
             return False
 
 
+# Process-wide client so every service shares one connection pool
+_shared_client: Optional[TrelloClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_shared_client() -> TrelloClient:
+    """Get the process-wide TrelloClient, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = TrelloClient()
+    return _shared_client
+
+def reset_shared_client():
+    """Forget the process-wide client so the next get_shared_client() builds a fresh one
+    
+    For forked worker processes, whose inherited pooled sockets still belong to the parent.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = None
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Trello Event Log
+Append-only, segmented on-disk log of normalized webhook events, with fast replay
+"""
+
+import argparse
+import bisect
+import fcntl
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, List, Tuple
+from config import TrelloConfig
+
+# Record header: payload length, crc32 of the payload, flags, offset, timestamp
+RECORD_HEADER = struct.Struct('<IIBQd')
+# Index entry: offset relative to the segment base, byte position in the segment, timestamp
+INDEX_ENTRY = struct.Struct('<IId')
+
+FLAG_ZLIB = 0x01
+COMPRESS_MIN_BYTES = 256  # Smaller payloads don't shrink enough to pay for zlib
+
+@dataclass
+class LogRecord:
+    """One logged event and where it sits in the log"""
+    offset: int
+    timestamp: float
+    event: Dict[str, Any]
+
+def encode_event(event: Dict[str, Any]) -> Tuple[bytes, int]:
+    """Compact JSON, zlib-compressed when that helps; returns (payload, flags)"""
+    payload = json.dumps(event, separators=(',', ':'), default=str).encode('utf-8')
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            return compressed, FLAG_ZLIB
+    return payload, 0
+
+def decode_event(payload: bytes, flags: int) -> Dict[str, Any]:
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return json.loads(payload)
+
+class LogSegment:
+    """A <base offset>.log file of records plus its <base offset>.idx offset index"""
+    
+    def __init__(self, directory: str, base_offset: int):
+        self.base_offset = base_offset
+        self.log_path = os.path.join(directory, f"{base_offset:020d}.log")
+        self.index_path = os.path.join(directory, f"{base_offset:020d}.idx")
+        self.entries = 0
+        self.size = 0
+        self.first_timestamp: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+    
+    @property
+    def next_offset(self) -> int:
+        return self.base_offset + self.entries
+    
+    def load(self, repair: bool = True):
+        """Read the index and drop anything a crash left half-written
+        
+        Without repair (readers) the files are left as they are and the
+        half-written tail is only skipped.
+        """
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        entries = index_size // INDEX_ENTRY.size
+        if not repair and not (os.path.exists(self.log_path) and os.path.exists(self.index_path)):
+            return
+        
+        mode = 'ab+' if repair else 'rb'
+        with open(self.index_path, mode) as index_file, open(self.log_path, mode) as log_file:
+            index_file.seek(0)
+            index = index_file.read(entries * INDEX_ENTRY.size)
+            # Keep index entries whose record is fully on disk
+            valid, position = 0, 0
+            for i in range(entries):
+                _, entry_position, _ = INDEX_ENTRY.unpack_from(index, i * INDEX_ENTRY.size)
+                end = self._record_end(log_file, entry_position, log_size)
+                if end is None:
+                    break
+                valid, position = i + 1, end
+            # Records written after the last index entry (crash between the two writes)
+            missing = []
+            while True:
+                end = self._record_end(log_file, position, log_size)
+                if end is None:
+                    break
+                log_file.seek(position)
+                _, _, _, offset, timestamp = RECORD_HEADER.unpack(log_file.read(RECORD_HEADER.size))
+                missing.append(INDEX_ENTRY.pack(offset - self.base_offset, position, timestamp))
+                position = end
+            
+            if repair:
+                log_file.truncate(position)
+                index_file.truncate(valid * INDEX_ENTRY.size)
+                index_file.seek(0, os.SEEK_END)
+                index_file.write(b''.join(missing))
+            index = index[:valid * INDEX_ENTRY.size] + b''.join(missing)
+        
+        self.entries = len(index) // INDEX_ENTRY.size
+        self.size = position
+        if self.entries:
+            self.first_timestamp = INDEX_ENTRY.unpack_from(index, 0)[2]
+            self.last_timestamp = INDEX_ENTRY.unpack_from(index, len(index) - INDEX_ENTRY.size)[2]
+    
+    @staticmethod
+    def _record_end(log_file, position: int, log_size: int) -> Optional[int]:
+        """End of the record at position, or None if it is truncated or corrupt"""
+        if position + RECORD_HEADER.size > log_size:
+            return None
+        log_file.seek(position)
+        length, crc, _, _, _ = RECORD_HEADER.unpack(log_file.read(RECORD_HEADER.size))
+        end = position + RECORD_HEADER.size + length
+        if end > log_size or zlib.crc32(log_file.read(length)) != crc:
+            return None
+        return end
+    
+    def delete(self):
+        for path in (self.log_path, self.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+class EventLog:
+    """Append-only event history split into size/age-bounded segments
+    
+    Each record is a small binary header (length, crc, offset, timestamp) and a
+    compact JSON body, zlib-compressed when large. Every segment has an index of
+    (offset, position, timestamp) entries, so a replay can start at any offset
+    or time with a binary search and then read the mmap'd segment sequentially.
+    Segments older than the retention period are deleted whole.
+    
+    One process writes a directory at a time: the writer holds an exclusive
+    flock on its lock file, and opening a locked log for writing raises
+    RuntimeError. A read_only log never writes, repairs or deletes anything, so
+    it can replay a directory another process is appending to.
+    """
+    
+    LOCK_FILE = 'writer.lock'
+    
+    def __init__(self, directory: str = None, segment_bytes: int = None,
+                 segment_seconds: float = None, retention_seconds: float = None, fsync: bool = None,
+                 read_only: bool = False):
+        self.directory = directory or TrelloConfig.EVENT_LOG_DIR
+        self.segment_bytes = segment_bytes or TrelloConfig.EVENT_LOG_SEGMENT_BYTES
+        self.segment_seconds = segment_seconds or TrelloConfig.EVENT_LOG_SEGMENT_SECONDS
+        self.retention_seconds = retention_seconds or TrelloConfig.EVENT_LOG_RETENTION_SECONDS
+        self.fsync = TrelloConfig.EVENT_LOG_FSYNC if fsync is None else fsync
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._lock_fd: Optional[int] = None
+        if not read_only:
+            os.makedirs(self.directory, exist_ok=True)
+            self._acquire_writer_lock()
+        
+        self.segments: List[LogSegment] = []
+        names = sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+        for name in names:
+            if name.endswith('.log'):
+                segment = LogSegment(self.directory, int(name[:-4]))
+                segment.load(repair=not read_only)
+                self.segments.append(segment)
+        if read_only:
+            if not self.segments:
+                self.segments.append(LogSegment(self.directory, 0))
+            return
+        if not self.segments:
+            self.segments.append(self._new_segment(0))
+        self._open_active()
+        self.apply_retention()
+    
+    def _acquire_writer_lock(self):
+        fd = os.open(os.path.join(self.directory, self.LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(f"Event log {self.directory} is already open for writing by another process")
+        self._lock_fd = fd
+    
+    @property
+    def next_offset(self) -> int:
+        return self.segments[-1].next_offset
+    
+    def _new_segment(self, base_offset: int) -> LogSegment:
+        segment = LogSegment(self.directory, base_offset)
+        segment.load()  # Creates both files
+        return segment
+    
+    def _open_active(self):
+        active = self.segments[-1]
+        self._log_file = open(active.log_path, 'ab')
+        self._index_file = open(active.index_path, 'ab')
+    
+    def append(self, event: Dict[str, Any]) -> int:
+        """Persist an event; returns its offset"""
+        if self.read_only:
+            raise RuntimeError(f"Event log {self.directory} is open read-only")
+        payload, flags = encode_event(event)
+        with self._lock:
+            active = self.segments[-1]
+            # Timestamps never go backwards, so the index can be searched by time
+            timestamp = max(time.time(), active.last_timestamp or 0.0)
+            if active.entries and (active.size >= self.segment_bytes or
+                                   timestamp - active.first_timestamp >= self.segment_seconds):
+                self._roll()
+                active = self.segments[-1]
+            
+            offset = active.next_offset
+            header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), flags, offset, timestamp)
+            self._log_file.write(header + payload)
+            self._log_file.flush()
+            self._index_file.write(INDEX_ENTRY.pack(offset - active.base_offset, active.size, timestamp))
+            self._index_file.flush()
+            if self.fsync:
+                os.fsync(self._log_file.fileno())
+            
+            active.entries += 1
+            active.size += len(header) + len(payload)
+            active.first_timestamp = active.first_timestamp or timestamp
+            active.last_timestamp = timestamp
+            return offset
+    
+    def _roll(self):
+        """Start a new active segment (caller holds the lock)"""
+        self._log_file.close()
+        self._index_file.close()
+        self.segments.append(self._new_segment(self.next_offset))
+        self._open_active()
+        self._apply_retention()
+    
+    def apply_retention(self) -> int:
+        """Delete segments whose newest event is past the retention period; returns how many"""
+        if self.read_only:
+            return 0
+        with self._lock:
+            return self._apply_retention()
+    
+    def _apply_retention(self) -> int:
+        cutoff = time.time() - self.retention_seconds
+        expired = [segment for segment in self.segments[:-1]
+                   if segment.last_timestamp is None or segment.last_timestamp < cutoff]
+        for segment in expired:
+            segment.delete()
+            self.segments.remove(segment)
+        return len(expired)
+    
+    def handle_webhook_event(self, event: Dict[str, Any]):
+        """TrelloWebhookHandler recorder: log every normalized event"""
+        self.append(event)
+    
+    def replay(self, from_offset: Optional[int] = None, since: Optional[float] = None) -> Iterator[LogRecord]:
+        """Yield logged events in order, from an offset and/or a unix timestamp on
+        
+        Only records on disk when the replay starts are read.
+        """
+        with self._lock:
+            segments = [(segment, segment.entries, segment.size) for segment in self.segments]
+        
+        for segment, entries, size in segments:
+            if not entries:
+                continue
+            if from_offset is not None and segment.base_offset + entries <= from_offset:
+                continue
+            if since is not None and segment.last_timestamp is not None and segment.last_timestamp < since:
+                continue
+            try:
+                yield from self._replay_segment(segment, entries, size, from_offset, since)
+            except FileNotFoundError:
+                continue  # Removed by retention while we were replaying
+    
+    def _replay_segment(self, segment: LogSegment, entries: int, size: int,
+                        from_offset: Optional[int], since: Optional[float]) -> Iterator[LogRecord]:
+        with open(segment.index_path, 'rb') as index_file, open(segment.log_path, 'rb') as log_file:
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as index, \
+                    mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                # First index entry at or after the requested offset and time
+                start = 0
+                if from_offset is not None:
+                    start = max(start, from_offset - segment.base_offset)
+                if since is not None:
+                    timestamps = _IndexTimestamps(index, entries)
+                    start = max(start, bisect.bisect_left(timestamps, since))
+                if start >= entries:
+                    return
+                
+                position = INDEX_ENTRY.unpack_from(index, start * INDEX_ENTRY.size)[1]
+                while position < size:
+                    length, _, flags, offset, timestamp = RECORD_HEADER.unpack_from(log, position)
+                    body = position + RECORD_HEADER.size
+                    yield LogRecord(offset, timestamp, decode_event(log[body:body + length], flags))
+                    position = body + length
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'segments': len(self.segments),
+                'first_offset': self.segments[0].base_offset,
+                'next_offset': self.next_offset,
+                'bytes': sum(segment.size for segment in self.segments),
+                'oldest_event': self.segments[0].first_timestamp
+            }
+    
+    def close(self):
+        with self._lock:
+            if self.read_only:
+                return
+            self._log_file.close()
+            self._index_file.close()
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+
+class _IndexTimestamps:
+    """Sequence view of an index's timestamps, for bisect"""
+    
+    def __init__(self, index: mmap.mmap, entries: int):
+        self.index = index
+        self.entries = entries
+    
+    def __len__(self) -> int:
+        return self.entries
+    
+    def __getitem__(self, i: int) -> float:
+        return INDEX_ENTRY.unpack_from(self.index, i * INDEX_ENTRY.size)[2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged webhook events as JSON lines")
+    parser.add_argument('--dir', default=os.path.join(TrelloConfig.EVENT_LOG_DIR, 'dashboard'),
+                        help="event log directory (one per app)")
+    parser.add_argument('--offset', type=int, default=None, help="start at this offset")
+    parser.add_argument('--since', default=None, help="start at this time (ISO 8601)")
+    args = parser.parse_args()
+    
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    log = EventLog(args.dir, read_only=True)  # The app may be appending to it
+    try:
+        for record in log.replay(from_offset=args.offset, since=since):
+            sys.stdout.write(json.dumps({'offset': record.offset, 'timestamp': record.timestamp,
+                                         'event': record.event}) + '\n')
+    finally:
+        log.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Trello Event Stream
+Pushes normalized webhook events to connected dashboards over Server-Sent Events
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, List
+from config import TrelloConfig
+
+class StreamClient:
+    """One connected dashboard: its filters and a bounded outbox"""
+    
+    def __init__(self, boards: Iterable[str] = (), projects: Iterable[str] = (), max_queue: int = None):
+        self.boards = set(boards)  # Board ids or names; empty = every board
+        self.projects = set(projects)  # 'Project' custom field values; empty = every project
+        self.outbox: queue.Queue = queue.Queue(maxsize=max_queue or TrelloConfig.STREAM_CLIENT_QUEUE)
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+class EventBroadcaster:
+    """Fans webhook events out to every subscribed SSE client
+    
+    Register handle_webhook_event as a TrelloWebhookHandler listener. Each event is
+    serialized once and offered to the clients whose filters match, without
+    blocking: a client that falls behind by a full outbox has it emptied and gets
+    one 'resync' message telling it to refetch, so a slow tab never holds up the
+    webhook workers or the other tabs.
+    """
+    
+    def __init__(self, board_names: Optional[Dict[str, str]] = None,
+                 project_of: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+                 max_queue: int = None, heartbeat: float = None):
+        self.board_names = board_names or {}  # board id -> name, so clients can filter by name
+        self.project_of = project_of  # Resolves an event's project; project filters match nothing without it
+        self.max_queue = max_queue or TrelloConfig.STREAM_CLIENT_QUEUE
+        self.heartbeat = heartbeat or TrelloConfig.STREAM_HEARTBEAT
+        self._clients: List[StreamClient] = []
+        self._lock = threading.Lock()
+        
+        # Stats
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+    
+    def subscribe(self, boards: Iterable[str] = (), projects: Iterable[str] = ()) -> StreamClient:
+        client = StreamClient(boards, projects, self.max_queue)
+        with self._lock:
+            self._clients.append(client)
+        return client
+    
+    def unsubscribe(self, client: StreamClient):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+    
+    def handle_webhook_event(self, event: Dict[str, Any]):
+        """TrelloWebhookHandler listener: push the event to matching clients"""
+        if event.get('status') not in ('success', 'ignored'):
+            return
+        with self._lock:
+            clients = list(self._clients)
+        if not clients:
+            return
+        
+        board_id = event.get('board_id')
+        board_name = self.board_names.get(board_id, event.get('board_name'))
+        project = None
+        if self.project_of and any(client.projects for client in clients):
+            project = self.project_of(event)
+        
+        message = self.format_message(event.get('action') or event.get('action_type') or 'event',
+                                      event, event_id=event.get('action_id'))
+        self.published += 1
+        for client in clients:
+            if client.boards and board_id not in client.boards and board_name not in client.boards:
+                continue
+            if client.projects and project not in client.projects:
+                continue
+            self._offer(client, message)
+    
+    def _offer(self, client: StreamClient, message: str):
+        try:
+            client.outbox.put_nowait(message)
+            self.delivered += 1
+        except queue.Full:
+            # Backpressure: the client missed events, so it must refetch anyway
+            with client.outbox.mutex:
+                missed = len(client.outbox.queue)
+                client.outbox.queue.clear()
+            client.dropped += missed + 1
+            client.resyncs += 1
+            self.dropped += missed + 1
+            try:
+                client.outbox.put_nowait(self.format_message('resync', {'missed': missed + 1}))
+            except queue.Full:
+                pass  # Refilled by a concurrent publish; a resync will follow it
+    
+    @staticmethod
+    def format_message(event_type: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+        """One SSE message"""
+        lines = [f"id: {event_id}"] if event_id else []
+        lines.append(f"event: {event_type}")
+        lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+        return '\n'.join(lines) + '\n\n'
+    
+    def stream(self, client: StreamClient) -> Iterator[str]:
+        """SSE body for a client; unsubscribes it when the connection closes"""
+        try:
+            yield f"retry: {int(self.heartbeat * 1000)}\n\n"
+            while True:
+                try:
+                    message = client.outbox.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                    continue
+                client.sent += 1
+                yield message
+        finally:
+            self.unsubscribe(client)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = list(self._clients)
+        return {
+            'clients': len(clients),
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'backlog': sum(client.outbox.qsize() for client in clients),
+            'slow_clients': sum(1 for client in clients if client.resyncs)
+        }
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+@dataclass(frozen=True)
+class FieldProjection:
+    """The Trello attributes a call site actually needs, per resource
+    
+    An empty tuple means "no restriction" for that resource. Trello always returns 'id'.
+    """
+    board: Tuple[str, ...] = ()
+    card: Tuple[str, ...] = ()
+    list: Tuple[str, ...] = ()
+    label: Tuple[str, ...] = ()
+    member: Tuple[str, ...] = ()
+    
+    def to_snapshot_fields(self) -> Dict[str, List[str]]:
+        """Field selection for TrelloClient.get_board_snapshot"""
+        groups = {
+            'board': self.board,
+            'card': self.card,
+            'list': self.list,
+            'label': self.label,
+            'member': self.member
+        }
+        return {resource: list(names) for resource, names in groups.items() if names}
+    
+    def to_card_params(self) -> Dict[str, str]:
+        """Params for card collection endpoints (boards/{id}/cards, lists/{id}/cards)"""
+        params = {}
+        if self.card:
+            params['fields'] = ','.join(self.card)
+        if self.member:
+            params['member_fields'] = ','.join(self.member)
+        return params
+
+# Per-call-site projections. Keep these in sync with the keys each caller reads.
+
+# /api/account-management builds card_data from these
+ACCOUNT_MANAGEMENT_PROJECTION = FieldProjection(
+    board=('name', 'url'),
+    card=('name', 'desc', 'due', 'url', 'labels', 'idList'),
+    list=('name',),
+    member=('fullName', 'username')
+)
+
+# TrelloViewManager filters and groups cards and serves them from /api/view
+VIEW_MANAGER_PROJECTION = FieldProjection(
+    board=('name', 'url'),
+    card=('name', 'desc', 'due', 'url', 'labels', 'idList', 'closed'),
+    list=('name', 'closed', 'pos'),
+    label=('name', 'color'),
+    member=('fullName', 'username')
+)
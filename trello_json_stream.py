@@ -0,0 +1,80 @@
+import codecs
+import json
+from typing import Iterable, Iterator, Any
+
+# Characters json allows between array elements
+_WHITESPACE = ' \t\n\r'
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = 'utf-8') -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array, yielding one element at a time
+    
+    Only the element currently being decoded (plus one chunk) is held in memory, so
+    peak memory stays flat however long the array is. Elements are expected to be
+    objects or arrays, as Trello's collection endpoints return.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    chunk_iter = iter(chunks)
+    buffer = ''
+    pos = 0
+    exhausted = False
+    
+    def read_more() -> bool:
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            return False
+        for chunk in chunk_iter:
+            text = text_decoder.decode(chunk)
+            if text:
+                # Drop what has already been consumed before growing the buffer
+                buffer = buffer[pos:] + text
+                pos = 0
+                return True
+        tail = text_decoder.decode(b'', final=True)
+        buffer = buffer[pos:] + tail
+        pos = 0
+        exhausted = True
+        return bool(tail)
+    
+    def skip_whitespace() -> bool:
+        """Advance past whitespace; False if the stream ended"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not read_more():
+                return False
+    
+    if not skip_whitespace() or buffer[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    expect_separator = False
+    
+    while True:
+        if not skip_whitespace():
+            raise ValueError("Unterminated JSON array")
+        char = buffer[pos]
+        
+        if char == ']':
+            return
+        if expect_separator:
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' at offset {pos}, got {char!r}")
+            pos += 1
+            expect_separator = False
+            continue
+        
+        # Decode the next element, pulling more data until it is complete
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError:
+                if not read_more():
+                    raise
+        
+        pos = end
+        expect_separator = True
+        yield element
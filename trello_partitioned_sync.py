@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Partitioned Trello Sync
+Spreads a full sync over worker processes, one per source board (or card shard of a big board)
+"""
+
+import argparse
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+from trello_sync import TrelloSync
+from trello_sync_state import SyncLock
+from trello_client import reset_shared_client
+from trello_rate_limit import TokenBucketScheduler, set_shared_scheduler
+from config import TrelloConfig
+
+# Result fields that add up across partitions
+SUMMED_RESULT_KEYS = ('synced', 'skipped', 'failed', 'total', 'unchanged', 'changed', 'written', 'orphaned')
+
+@dataclass(frozen=True)
+class SyncPartition:
+    """One worker's share of a sync: a source board, or one card shard of it"""
+    board_name: str
+    shard: int = 0
+    shards: int = 1
+    
+    @property
+    def label(self) -> str:
+        return self.board_name if self.shards == 1 else f"{self.board_name}[{self.shard + 1}/{self.shards}]"
+    
+    def owns(self, card_id: str) -> bool:
+        """Cards are split between shards by a stable hash of their id"""
+        return self.shards == 1 or zlib.crc32(card_id.encode('utf-8')) % self.shards == self.shard
+
+def parse_board_shards(spec: str) -> Dict[str, int]:
+    """Parse "ilitigate_dev=4,design=2" into {'ilitigate_dev': 4, 'design': 2}"""
+    shards = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        board_name, _, count = item.partition('=')
+        shards[board_name.strip()] = max(1, int(count))
+    return shards
+
+def _init_worker(rate_share: float):
+    """Give this worker process its slice of the token's rate budget
+    
+    Runs before the worker makes any request, so its shared clients (its own
+    connection pools) pick the reduced scheduler up.
+    """
+    set_shared_scheduler(TokenBucketScheduler(max_requests=TrelloConfig.RATE_LIMIT_REQUESTS * rate_share))
+    # With a fork start method the parent's client (and its sockets) would be inherited
+    reset_shared_client()
+
+def sync_partition(partition: SyncPartition) -> Dict[str, Any]:
+    """Worker entry point: read one partition's source cards, then plan and apply them"""
+    started = time.perf_counter()
+    sync = TrelloSync()
+    # Shards of one board create cards in the same master list; keep their positions apart
+    sync.position_slot, sync.position_slots = partition.shard, partition.shards
+    board_id = sync.boards[partition.board_name]
+    
+    # Stream the board so a large one is never decoded whole; keep only this shard's cards
+    source_cards = []
+    for card in sync.client.iter_board_cards(board_id):
+        if partition.owns(card['id']):
+            card['source_board'] = partition.board_name
+            card['source_board_id'] = board_id
+            source_cards.append(card)
+    print(f"📋 {partition.label}: {len(source_cards)} cards")
+    
+    # Orphans can only be judged when the partition covers the whole board
+    boards = [partition.board_name] if partition.shards == 1 else None
+    # The coordinator already adopted existing master cards; don't rescan every board here
+    result = sync.reconcile(source_cards, boards=boards, adopt=False)
+    result['elapsed_seconds'] = time.perf_counter() - started
+    return result
+
+class PartitionedSync:
+    """Full sync with source boards (and shards of big boards) run in parallel worker processes
+    
+    Each worker has its own pooled client and an equal share of the global rate
+    budget, so wall time tracks the slowest partition instead of the sum of all.
+    The coordinator holds the single-flight sync lock for the whole run and merges
+    the per-partition results.
+    """
+    
+    def __init__(self, workers: int = None, board_shards: Optional[Dict[str, int]] = None,
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        self.sync = TrelloSync()
+        if board_shards is None:
+            board_shards = parse_board_shards(TrelloConfig.SYNC_BOARD_SHARDS)
+        
+        self.partitions: List[SyncPartition] = []
+        for board_name in self.sync.SOURCE_BOARDS:
+            shards = board_shards.get(board_name, 1)
+            self.partitions.extend(SyncPartition(board_name, shard, shards) for shard in range(shards))
+        
+        self.workers = min(workers or TrelloConfig.SYNC_PARTITION_WORKERS or len(self.partitions), len(self.partitions))
+        # Fresh interpreters: no inherited connection pools, sqlite handles or locks
+        self.mp_context = mp_context or multiprocessing.get_context('spawn')
+    
+    def run(self) -> Dict[str, Any]:
+        if TrelloConfig.VIRTUAL_MASTER:
+            # The dashboard builds the master view from the source boards; copying would only add writes
+            raise RuntimeError("virtual master mode is on (TRELLO_VIRTUAL_MASTER), no cards are copied")
+        
+        print(f"🚀 Running Partitioned Trello Sync ({len(self.partitions)} partitions, {self.workers} workers)")
+        print("=" * 50)
+        
+        lock = SyncLock(self.sync.state, 'sync')
+        if not lock.acquire():
+            raise RuntimeError("Another sync is running")
+        
+        try:
+            # Adopt existing master cards once here rather than in every worker
+            if self.sync.state.count_mappings() == 0:
+                self.sync.rebuild_card_mapping()
+            
+            started = time.perf_counter()
+            results = []
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context,
+                                     initializer=_init_worker, initargs=(1.0 / self.workers,)) as pool:
+                futures = {pool.submit(sync_partition, partition): partition for partition in self.partitions}
+                for future in as_completed(futures):
+                    partition = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Partition {partition.label} failed: {e}")
+                        result = {'error': str(e)}
+                    result['partition'] = partition.label
+                    result['board_name'] = partition.board_name
+                    results.append(result)
+            elapsed = time.perf_counter() - started
+        finally:
+            lock.release()
+        
+        return self._merge(results, elapsed)
+    
+    def _merge(self, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        merged = self.sync.empty_result()
+        for result in results:
+            for key in SUMMED_RESULT_KEYS:
+                merged[key] += result.get(key, 0)
+            merged['failures'].extend(result.get('failures', []))
+            if result.get('error'):
+                # Its cards were never synced; count the partition so the run isn't reported clean
+                merged['failed'] += 1
+                merged['failures'].append({
+                    'action': 'partition',
+                    'source_card_id': None,
+                    'source_board': result['board_name'],
+                    'name': result['partition'],
+                    'error': result['error']
+                })
+        merged['failed_partitions'] = sum(1 for result in results if result.get('error'))
+        
+        merged['cards_per_sec'] = (merged['synced'] + merged['written']) / elapsed if elapsed > 0 else 0.0
+        merged['elapsed_seconds'] = elapsed
+        merged['partitions'] = sorted(
+            (
+                {
+                    'partition': result['partition'],
+                    'elapsed_seconds': round(result.get('elapsed_seconds', 0.0), 2),
+                    'synced': result.get('synced', 0),
+                    'written': result.get('written', 0),
+                    'total': result.get('total', 0),
+                    'error': result.get('error')
+                }
+                for result in results
+            ),
+            key=lambda entry: entry['partition']
+        )
+        
+        print("\n" + "=" * 50)
+        print(f"🎉 Partitioned Sync Complete in {elapsed:.1f}s")
+        for entry in merged['partitions']:
+            status = f"❌ {entry['error']}" if entry['error'] else f"✅ {entry['synced']} created, {entry['written']} updated"
+            print(f"   {entry['partition']}: {status} ({entry['elapsed_seconds']}s)")
+        print(f"📊 Total processed: {merged['total']} cards ({merged['cards_per_sec']:.1f} cards/sec)")
+        if merged['failed_partitions']:
+            print(f"❌ {merged['failed_partitions']} partition(s) failed")
+        return merged
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a full sync with source boards spread over worker processes")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per partition)")
+    parser.add_argument('--shards', default=None, help='split big boards into card shards, e.g. "ilitigate_dev=4"')
+    args = parser.parse_args()
+    
+    board_shards = parse_board_shards(args.shards) if args.shards is not None else None
+    try:
+        return PartitionedSync(workers=args.workers, board_shards=board_shards).run()
+    except Exception as e:
+        print(f"❌ Sync failed: {e}")
+        return None
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Mapping
+from config import TrelloConfig
+
+# Statuses worth retrying; 5xx is only retried for idempotent methods
+RATE_LIMITED_STATUS = 429
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'PUT', 'DELETE'}
+
+class TokenBucketScheduler:
+    """Paces Trello requests with a token bucket and tracks throttling metrics"""
+    
+    def __init__(self, max_requests: int = None, interval: float = None, headroom: float = None,
+                 backoff_base: float = None, backoff_max: float = None):
+        max_requests = max_requests or TrelloConfig.RATE_LIMIT_REQUESTS
+        interval = interval or TrelloConfig.RATE_LIMIT_INTERVAL
+        headroom = headroom or TrelloConfig.RATE_LIMIT_HEADROOM
+        
+        # Stay just under the limit so bursts never reach Trello's hard cap
+        self.capacity = max(1.0, max_requests * headroom)
+        self.refill_rate = self.capacity / interval  # Tokens per second
+        self.headroom = headroom
+        self.backoff_base = backoff_base or TrelloConfig.BACKOFF_BASE
+        self.backoff_max = backoff_max or TrelloConfig.BACKOFF_MAX
+        
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._total_requests = 0
+        self._throttled_requests = 0
+        self._throttle_wait = 0.0
+        self._backoff_wait = 0.0
+        self._retries = 0
+        self._rate_limited_responses = 0
+        self._server_remaining: Optional[int] = None
+    
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill"""
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+            self._last_refill = now
+    
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            self._total_requests += 1
+            if self._tokens >= 0:
+                return 0.0
+            
+            # Token was borrowed from the future; wait until it has been earned
+            wait = -self._tokens / self.refill_rate
+            self._throttled_requests += 1
+            self._throttle_wait += wait
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+            return wait
+    
+    def _release_waiter(self):
+        with self._lock:
+            self._queue_depth -= 1
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release_waiter()
+    
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release_waiter()
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Sync the bucket with the quota Trello reports in its response headers"""
+        remaining = []
+        for scope in ('token', 'key'):
+            value = headers.get(f'x-rate-limit-api-{scope}-remaining')
+            if value is not None:
+                try:
+                    remaining.append(int(value))
+                except ValueError:
+                    continue
+        
+        if not remaining:
+            return
+        
+        with self._lock:
+            self._server_remaining = min(remaining)
+            # Never believe we have more quota than Trello says we do
+            self._tokens = min(self._tokens, self._server_remaining * self.headroom)
+    
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Jittered exponential backoff, honouring Retry-After when Trello sends it"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def record_retry(self, status_code: int, delay: float):
+        """Count a retried response and the time spent backing off"""
+        with self._lock:
+            self._retries += 1
+            self._backoff_wait += delay
+            if status_code == RATE_LIMITED_STATUS:
+                self._rate_limited_responses += 1
+                # Trello says we are over budget; drain the bucket so others slow down too
+                self._tokens = min(self._tokens, 0.0)
+    
+    def estimate_wait(self, requests: int) -> float:
+        """Seconds of client-side throttling a burst of this many requests would incur right now"""
+        with self._lock:
+            self._refill(time.monotonic())
+            deficit = requests - max(self._tokens, 0.0)
+        return max(deficit, 0.0) / self.refill_rate
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throttle wait time and retry counters"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'queue_depth': self._queue_depth,
+                'max_queue_depth': self._max_queue_depth,
+                'total_requests': self._total_requests,
+                'throttled_requests': self._throttled_requests,
+                'throttle_wait_seconds': round(self._throttle_wait, 3),
+                'avg_throttle_wait_seconds': round(self._throttle_wait / self._throttled_requests, 3) if self._throttled_requests else 0.0,
+                'retries': self._retries,
+                'backoff_wait_seconds': round(self._backoff_wait, 3),
+                'rate_limited_responses': self._rate_limited_responses,
+                'tokens_available': round(max(self._tokens, 0.0), 2),
+                'server_remaining': self._server_remaining
+            }
+
+def should_retry(method: str, status_code: int) -> bool:
+    """429 is always safe to retry; 5xx only when replaying cannot duplicate a write"""
+    if status_code == RATE_LIMITED_STATUS:
+        return True
+    return status_code in RETRYABLE_STATUSES and method in IDEMPOTENT_METHODS
+
+# Trello limits are per token, so every client in the process shares one bucket
+_shared_scheduler: Optional[TokenBucketScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+def get_shared_scheduler() -> TokenBucketScheduler:
+    """Get the process-wide scheduler, creating it on first use"""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = TokenBucketScheduler()
+    return _shared_scheduler
+
+def set_shared_scheduler(scheduler: TokenBucketScheduler):
+    """Replace the process-wide scheduler, e.g. with a slice of the budget in a worker process
+    
+    Must run before the shared clients are created, since they keep the scheduler they start with.
+    """
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        _shared_scheduler = scheduler
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Real-time Trello Sync
+Applies source-board webhook events to the Master board as they arrive
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from trello_sync import TrelloSync
+from trello_sync_state import SyncLock
+
+logger = logging.getLogger(__name__)
+
+class RealtimeSync:
+    """Turns source-board card webhooks into master-board creates/updates within seconds
+    
+    Webhook listeners must return quickly, so events only queue the touched card id;
+    a background worker re-reads just those cards and reconciles them. Bursts on the
+    same card collapse into one fetch while it is still queued.
+    """
+    
+    # Card actions that can change what the master board should show
+    SYNC_ACTION_TYPES = {
+        'createCard', 'updateCard', 'copyCard', 'moveCardToBoard',
+        'convertToCardFromCheckItem', 'addLabelToCard', 'removeLabelFromCard'
+    }
+    MAX_BATCH = 10  # Cards reconciled together; one Trello /batch request
+    LOCK_TIMEOUT = 600  # Seconds to wait for a scheduled/manual sync to finish
+    
+    def __init__(self, sync: Optional[TrelloSync] = None):
+        self.sync = sync or TrelloSync()
+        self.board_names = {self.sync.boards[name]: name for name in self.sync.SOURCE_BOARDS}
+        # Shared with auto_sync/manual_sync so two writers never create the same card
+        self.lock = SyncLock(self.sync.state, 'sync')
+        
+        self._queue: queue.Queue = queue.Queue()  # (card id, enqueue time)
+        self._pending: Dict[str, str] = {}  # card id -> source board name, while queued
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        
+        # Stats
+        self.events_received = 0
+        self.events_coalesced = 0
+        self.cards_synced = 0
+        self.failures = 0
+        self.last_sync_lag: Optional[float] = None  # Seconds from enqueue to master write
+    
+    def handle_webhook_event(self, event: Dict[str, Any]):
+        """TrelloWebhookHandler listener: queue the touched card for syncing"""
+        board_name = self.board_names.get(event.get('board_id'))
+        card_id = event.get('card_id')
+        if not board_name or not card_id or event.get('action_type') not in self.SYNC_ACTION_TYPES:
+            return
+        
+        with self._lock:
+            self.events_received += 1
+            if card_id in self._pending:
+                self.events_coalesced += 1
+                return
+            self._pending[card_id] = board_name
+            self._ensure_worker()
+        self._queue.put((card_id, time.monotonic()))
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='realtime-sync', daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._sync_batch(batch)
+    
+    def _sync_batch(self, batch: List[Tuple[str, float]]):
+        with self._lock:
+            touched = {card_id: self._pending.pop(card_id) for card_id, _ in batch}
+        
+        if not self.lock.acquire(blocking=True, timeout=self.LOCK_TIMEOUT):
+            # The next incremental or full sync picks these cards up instead
+            self.failures += len(touched)
+            logger.warning(f"Real-time sync skipped {len(touched)} card(s): sync lock busy")
+            return
+        
+        try:
+            source_cards = self.sync.fetch_source_cards(touched)
+            if source_cards:
+                result = self.sync.reconcile(source_cards)
+                self.failures += result['failed']
+                self.cards_synced += result['synced'] + result['written']
+            enqueued = min(enqueued_at for _, enqueued_at in batch)
+            self.last_sync_lag = time.monotonic() - enqueued
+            logger.info(f"Real-time sync applied {len(touched)} card event(s) in {self.last_sync_lag:.1f}s")
+        except Exception as e:
+            # The next incremental or full sync picks these cards up again
+            self.failures += len(touched)
+            logger.error(f"Real-time sync failed for {len(touched)} card(s): {e}")
+        finally:
+            self.lock.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'events_received': self.events_received,
+                'events_coalesced': self.events_coalesced,
+                'queued': len(self._pending),
+                'cards_synced': self.cards_synced,
+                'failures': self.failures,
+                'last_sync_lag_seconds': round(self.last_sync_lag, 3) if self.last_sync_lag is not None else None
+            }
+
+# Process-wide syncer shared by every webhook endpoint
+_realtime_sync: Optional[RealtimeSync] = None
+_realtime_sync_lock = threading.Lock()
+
+def get_realtime_sync() -> RealtimeSync:
+    """Get the process-wide RealtimeSync, creating it on first use"""
+    global _realtime_sync
+    if _realtime_sync is None:
+        with _realtime_sync_lock:
+            if _realtime_sync is None:
+                _realtime_sync = RealtimeSync()
+    return _realtime_sync
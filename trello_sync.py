@@ -4,17 +4,103 @@ Trello Board Sync Automation
 Syncs cards from all boards to the Master board for project management visibility
 """
 
-from trello_client import TrelloClient
-from typing import List, Dict, Optional
+from trello_client import get_shared_client
+from trello_async_client import AsyncTrelloClient
+from trello_fields import FieldProjection
+from trello_sync_state import SyncStateStore
+from config import TrelloConfig
+from typing import List, Dict, Optional, Iterator, Tuple, Any
+import aiohttp
+import asyncio
+import hashlib
+import re
 import time
 import json
-from datetime import datetime
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+
+# Master descriptions link back with "🔗 Original card: https://trello.com/c/<shortLink>/..."
+ORIGINAL_CARD_RE = re.compile(r'🔗 Original card: https://trello\.com/c/([A-Za-z0-9]+)')
+CARD_SHORT_LINK_RE = re.compile(r'trello\.com/c/([A-Za-z0-9]+)')
+
+@dataclass
+class SyncPlan:
+    """What one sync run will do, worked out from a single snapshot of the source cards
+    
+    Everything execution needs is captured here, so a plan can be inspected (dry run)
+    and executed later without re-reading the boards.
+    """
+    source_cards: List[Dict]
+    boards: List[str] = field(default_factory=list)  # Source boards the snapshot fully covers
+    creates: List[Tuple[Dict, str]] = field(default_factory=list)  # (source card, master list id)
+    updates: List[Tuple[Dict, Dict]] = field(default_factory=list)  # (source card, mapping row)
+    noops: List[Dict] = field(default_factory=list)  # Mapped and unchanged since the last sync
+    unroutable: List[Dict] = field(default_factory=list)  # No master list to put them in
+    orphans: List[Dict] = field(default_factory=list)  # Mapping rows whose source card is gone
+    adopted: List[Tuple] = field(default_factory=list)  # Mapping rows rebuilt from master descriptions, saved on execute
+    plan_requests: int = 0  # Trello requests spent building the plan
+    estimated_requests: int = 0  # Trello requests executing it should take
+    estimated_wait_seconds: float = 0.0  # Client-side rate-limit wait for those requests
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'create': len(self.creates),
+            'update': len(self.updates),
+            'skip': len(self.noops) + len(self.unroutable),
+            'orphan': len(self.orphans),
+            'estimated_requests': self.estimated_requests,
+            'estimated_wait_seconds': round(self.estimated_wait_seconds, 2)
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly diff of the plan"""
+        def card_entry(card: Dict, **extra) -> Dict:
+            entry = {
+                'source_card_id': card['id'],
+                'source_board': card['source_board'],
+                'name': f"[{card['source_board'].upper()}] {card['name']}"
+            }
+            entry.update(extra)
+            return entry
+        
+        return {
+            'created_at': self.created_at,
+            'boards': self.boards,
+            'summary': self.summary(),
+            'plan_requests': self.plan_requests,
+            'create': [card_entry(card, list_id=list_id) for card, list_id in self.creates],
+            'update': [card_entry(card, master_card_id=mapping['master_card_id']) for card, mapping in self.updates],
+            'skip': ([card_entry(card, reason='unchanged') for card in self.noops] +
+                     [card_entry(card, reason='no master list') for card in self.unroutable]),
+            'orphan': [
+                {'source_card_id': row['source_card_id'], 'source_board': row['source_board'],
+                 'master_card_id': row['master_card_id']}
+                for row in self.orphans
+            ]
+        }
 
 class TrelloSync:
     """Syncs cards across Trello boards"""
     
+    # Master cards are only read to rebuild the card mapping from their descriptions
+    MASTER_CARD_PROJECTION = FieldProjection(card=('desc',), member=('id',))
+    
+    # Boards whose cards are copied to the master board
+    SOURCE_BOARDS = ['design', 'ux_review', 'ilitigate_dev', 'account_management']
+    
+    # Card actions that can change what the master board should show
+    CARD_ACTION_TYPES = ('createCard,updateCard,deleteCard,copyCard,moveCardToBoard,moveCardFromBoard,'
+                         'convertToCardFromCheckItem,addLabelToCard,removeLabelFromCard')
+    ACTIONS_PAGE_LIMIT = 1000  # Trello's max; a full page means we may have missed actions
+    
+    # New master cards get explicit positions this far apart (Trello's own spacing), so
+    # concurrent creates keep source order within each list
+    POSITION_STEP = 16384
+    LIST_POSITION_PROJECTION = FieldProjection(card=('pos',))
+    
     def __init__(self):
-        self.client = TrelloClient()
+        self.client = get_shared_client()
         
         # Board IDs for your 6-board structure
         self.boards = {
@@ -36,27 +122,54 @@ class TrelloSync:
         
         # Track synced cards to avoid duplicates
         self.synced_cards = set()
+        
+        # Source boards fetched by the last get_all_cards_from_source_boards call
+        self.last_changed_boards = []
+        # Source boards with cards the last fetch_source_cards call could not read
+        self.last_failed_boards = set()
+        
+        # This sync's slot among position_slots syncs creating cards in the same lists at once
+        self.position_slot = 0
+        self.position_slots = 1
+        
+        # Action cursors and the source -> master card mapping, persisted between runs
+        self.state = SyncStateStore()
     
     def get_all_cards_from_source_boards(self) -> List[Dict]:
-        """Get all cards from source boards (excluding master and weekly planning)"""
+        """Get all cards from source boards (excluding master and weekly planning)
+        
+        self.last_changed_boards lists the boards that were fetched successfully.
+        """
         all_cards = []
         
-        source_boards = ['design', 'ux_review', 'ilitigate_dev', 'account_management']
+        source_boards = self.SOURCE_BOARDS
+        
+        # Fetch every source board concurrently instead of one after another
+        results = asyncio.run(self._fetch_board_cards_concurrently(source_boards))
         
-        for board_name in source_boards:
+        self.last_changed_boards = []
+        for board_name, cards in zip(source_boards, results):
             board_id = self.boards[board_name]
-            try:
-                cards = self.client.get_board_cards(board_id)
-                for card in cards:
-                    card['source_board'] = board_name
-                    card['source_board_id'] = board_id
-                    all_cards.append(card)
-                print(f"📋 Found {len(cards)} cards in {board_name}")
-            except Exception as e:
-                print(f"❌ Error getting cards from {board_name}: {e}")
+            if isinstance(cards, Exception):
+                print(f"❌ Error getting cards from {board_name}: {cards}")
+                continue
+            self.last_changed_boards.append(board_name)
+            for card in cards:
+                card['source_board'] = board_name
+                card['source_board_id'] = board_id
+                all_cards.append(card)
+            print(f"📋 Found {len(cards)} cards in {board_name}")
         
         return all_cards
     
+    async def _fetch_board_cards_concurrently(self, board_names: List[str]) -> List:
+        """Fetch cards for several boards at once; failures are returned in place"""
+        async with AsyncTrelloClient() as client:
+            return await asyncio.gather(
+                *(client.get_board_cards(self.boards[name]) for name in board_names),
+                return_exceptions=True
+            )
+    
     def get_master_board_lists(self) -> Dict[str, str]:
         """Get master board lists and their IDs"""
         master_lists = {}
@@ -70,170 +183,557 @@ class TrelloSync:
         
         return master_lists
     
-    def create_sync_card_on_master(self, source_card: Dict, target_list_id: str) -> Optional[Dict]:
-        """Create a synced card on the master board"""
+    def iter_master_cards(self) -> Iterator[Dict]:
+        """Stream master board cards (trimmed to id and desc) as they arrive
+        
+        The master board only grows, so it is never decoded into one big list.
+        """
+        return self.client.iter_board_cards(self.boards['master'], projection=self.MASTER_CARD_PROJECTION)
+    
+    def render_master_card(self, source_card: Dict) -> Tuple[str, str]:
+        """Name and description of a source card's master copy"""
+        # Card name with source board indicator
+        source_board = source_card['source_board']
+        card_name = f"[{source_board.upper()}] {source_card['name']}"
+        
+        # Description with sync info and original card link
+        original_desc = source_card.get('desc', '')
+        sync_info = f"🔄 Synced from {source_board} board\n"
+        sync_info += f"📅 Last synced: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+        sync_info += f"🔗 Original card: {source_card['url']}\n\n"
+        
+        return card_name, sync_info + original_desc
+    
+    @staticmethod
+    def content_hash(source_card: Dict) -> str:
+        """Hash of the source fields that matter to the master copy
+        
+        Covers name, desc, due, labels and list (plus board and url, which the copy
+        is rendered from); the "Last synced" timestamp is deliberately left out so
+        an untouched card always hashes the same.
+        """
+        labels = sorted(label.get('id', '') for label in source_card.get('labels') or [])
+        content = json.dumps(
+            [
+                source_card['source_board'],
+                source_card['name'],
+                source_card.get('desc', ''),
+                source_card.get('due'),
+                labels,
+                source_card.get('idList'),
+                source_card['url']
+            ],
+            ensure_ascii=False
+        )
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+    
+    def rebuild_card_mapping(self, source_cards: Optional[List[Dict]] = None) -> int:
+        """Rebuild the source -> master mapping from the original-card links in master descriptions
+        
+        Used to adopt master cards created before the mapping existed, or after the
+        state file was lost, and by full scans to drop mappings whose master copy was
+        deleted. Mappings that still point at a live master card are kept as they are,
+        content hash included. Returns the number of mappings recorded.
+        """
+        print("🔗 Rebuilding source -> master card mapping...")
+        scan = self._scan_card_mapping(source_cards)
+        if scan is None:
+            return 0
+        rows, stale, unmatched = scan
+        
+        self.state.set_mappings(rows)
+        
+        # Master copies that were deleted or archived get recreated by the next sync
+        for source_id in stale:
+            self.state.remove_mapping(source_id)
+        
+        print(f"🔗 Mapped {len(rows)} master cards, dropped {len(stale)} stale mappings "
+              f"({unmatched} master cards without a live source card)")
+        return len(rows)
+    
+    def _scan_card_mapping(self, source_cards: Optional[List[Dict]] = None) -> Optional[Tuple[List[Tuple], List[str], int]]:
+        """Read the master board and work out mapping changes without saving them
+        
+        Returns (new or changed mapping rows, stale source ids, unmatched master card
+        count), or None if the master board could not be read.
+        """
+        if source_cards is None:
+            source_cards = self.get_all_cards_from_source_boards()
+        
+        by_short_link = {}
+        for card in source_cards:
+            match = CARD_SHORT_LINK_RE.search(card.get('url', ''))
+            if match:
+                by_short_link[match.group(1)] = card
+        
+        existing = self.state.get_mappings()
+        rows = []
+        mapped = set()
+        live_master_ids = set()
+        unmatched = 0
         try:
-            # Create card name with source board indicator
-            source_board = source_card['source_board']
-            card_name = f"[{source_board.upper()}] {source_card['name']}"
-            
-            # Create description with sync info and original card link
-            original_desc = source_card.get('desc', '')
-            sync_info = f"🔄 Synced from {source_board} board\n"
-            sync_info += f"📅 Last synced: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-            sync_info += f"🔗 Original card: {source_card['url']}\n\n"
-            
-            new_desc = sync_info + original_desc
-            
-            # Create the card
-            new_card = self.client.create_card(
-                list_id=target_list_id,
-                name=card_name,
-                desc=new_desc
-            )
-            
-            # Copy labels from source card
-            source_labels = source_card.get('labels', [])
-            for label in source_labels:
-                try:
-                    # Add label to the new card (this might need to be done via API)
-                    pass  # Labels will be copied via the description for now
-                except:
-                    pass
-            
-            print(f"✅ Created sync card: {card_name}")
-            return new_card
-            
+            for master_card in self.iter_master_cards():
+                live_master_ids.add(master_card['id'])
+                match = ORIGINAL_CARD_RE.search(master_card.get('desc') or '')
+                source_card = by_short_link.get(match.group(1)) if match else None
+                if not source_card or source_card['id'] in mapped:
+                    # Not a synced card, its source is gone, or a duplicate copy
+                    unmatched += 1
+                    continue
+                mapped.add(source_card['id'])
+                current = existing.get(source_card['id'])
+                if current and current['master_card_id'] == master_card['id']:
+                    continue
+                # No content hash: the next update rewrites the card and records one
+                rows.append((source_card['id'], master_card['id'], source_card['source_board'], None, None))
         except Exception as e:
-            print(f"❌ Error creating sync card: {e}")
+            print(f"❌ Error reading master cards: {e}")
             return None
+        
+        stale = [source_id for source_id, mapping in existing.items()
+                 if mapping['master_card_id'] not in live_master_ids and source_id not in mapped]
+        return rows, stale, unmatched
     
-    def sync_cards_to_master(self):
-        """Main sync function - syncs all cards to master board"""
-        print("🔄 Starting Trello Board Sync...")
-        print("=" * 50)
+    def _record_created(self, source_card: Dict, new_card: Dict):
+        self.state.set_mapping(
+            source_card['id'], new_card['id'], source_card['source_board'],
+            self.content_hash(source_card), datetime.now(timezone.utc).isoformat()
+        )
+    
+    def plan(self) -> SyncPlan:
+        """Read every source board once and work out what a full sync would do and cost
         
-        # Get all cards from source boards
+        Nothing is written; pass the result to execute_plan() to apply it.
+        """
+        requests_before = self.client.scheduler.get_metrics()['total_requests']
         source_cards = self.get_all_cards_from_source_boards()
-        print(f"📊 Total source cards: {len(source_cards)}")
+        plan = self.build_plan(source_cards, boards=self.last_changed_boards)
+        plan.plan_requests = self.client.scheduler.get_metrics()['total_requests'] - requests_before
+        return plan
+    
+    def build_plan(self, source_cards: List[Dict], boards: Optional[List[str]] = None, adopt: bool = True) -> SyncPlan:
+        """Sort source cards into creates, updates, no-ops and orphans against the card mapping
         
-        # Get master board lists
-        master_lists = self.get_master_board_lists()
+        source_cards is the run's one snapshot of the source boards; boards lists the
+        ones it fully covers (None for a partial snapshot, e.g. only touched cards).
+        Orphans are only reported for fully covered boards. With adopt=False an empty
+        mapping is taken as is, for callers that already rebuilt it. The state store
+        is not modified.
+        """
+        boards = list(boards or [])
+        complete = set(self.SOURCE_BOARDS) <= set(boards)
+        plan = SyncPlan(source_cards=source_cards, boards=boards)
         
-        # Get existing master board cards to avoid duplicates
-        try:
-            existing_master_cards = self.client.get_board_cards(self.boards['master'])
-            existing_card_names = {card['name'] for card in existing_master_cards}
-            print(f"📋 Existing master cards: {len(existing_master_cards)}")
-        except Exception as e:
-            print(f"❌ Error getting existing master cards: {e}")
-            existing_card_names = set()
+        # Adopt existing master cards the first time the mapping is used
+        adopted = {}
+        if adopt and self.state.count_mappings() == 0:
+            scan = self._scan_card_mapping(source_cards if complete else None)
+            if scan:
+                plan.adopted = scan[0]
+                adopted = {
+                    row[0]: {'source_card_id': row[0], 'master_card_id': row[1], 'source_board': row[2],
+                             'content_hash': row[3], 'last_synced': row[4]}
+                    for row in plan.adopted
+                }
         
-        # Sync each source card to master board
-        synced_count = 0
-        skipped_count = 0
+        master_lists = self.get_master_board_lists()
+        if boards:
+            all_mappings = self.state.get_mappings()
+            all_mappings.update(adopted)
+            snapshot_ids = {card['id'] for card in source_cards}
+            plan.orphans = [mapping for source_id, mapping in all_mappings.items()
+                            if mapping['source_board'] in boards and source_id not in snapshot_ids]
+            mappings = all_mappings
+        else:
+            mappings = self.state.get_mappings(card['id'] for card in source_cards)
+            mappings.update(adopted)
         
         for source_card in source_cards:
-            source_board = source_card['source_board']
+            mapping = mappings.get(source_card['id'])
+            if mapping:
+                # Already on master (matched by id, so renames keep their link)
+                if self.content_hash(source_card) == mapping['content_hash']:
+                    plan.noops.append(source_card)
+                else:
+                    plan.updates.append((source_card, mapping))
+                continue
             
-            # Determine target list
-            if source_board in self.list_mapping:
-                target_list_name = self.list_mapping[source_board]
-                target_list_id = master_lists.get(target_list_name)
-                
-                if not target_list_id:
-                    print(f"⚠️  Target list '{target_list_name}' not found in master board")
-                    continue
-                
-                # Check if card already exists (by name pattern)
-                expected_name = f"[{source_board.upper()}] {source_card['name']}"
-                
-                if expected_name in existing_card_names:
-                    print(f"⏭️  Skipping existing card: {expected_name}")
-                    skipped_count += 1
-                    continue
-                
-                # Create sync card
-                new_card = self.create_sync_card_on_master(source_card, target_list_id)
-                if new_card:
-                    synced_count += 1
-                    existing_card_names.add(expected_name)  # Add to set to avoid duplicates
-            else:
+            source_board = source_card['source_board']
+            if source_board not in self.list_mapping:
                 print(f"⚠️  No mapping found for board: {source_board}")
+                plan.unroutable.append(source_card)
+                continue
+            
+            target_list_name = self.list_mapping[source_board]
+            target_list_id = master_lists.get(target_list_name)
+            if not target_list_id:
+                print(f"⚠️  Target list '{target_list_name}' not found in master board")
+                plan.unroutable.append(source_card)
+                continue
+            
+            plan.creates.append((source_card, target_list_id))
+        
+        # One position read per target list, then one request per create and update
+        plan.estimated_requests = (len({list_id for _, list_id in plan.creates}) +
+                                   len(plan.creates) + len(plan.updates))
+        plan.estimated_wait_seconds = self.client.scheduler.estimate_wait(plan.estimated_requests)
+        
+        print(f"🧮 Plan: {len(plan.creates)} to create, {len(plan.updates)} to update, "
+              f"{len(plan.noops)} unchanged, {len(plan.orphans)} orphaned "
+              f"(~{plan.estimated_requests} requests, ~{plan.estimated_wait_seconds:.1f}s rate-limit wait)")
+        return plan
+    
+    def execute_plan(self, plan: SyncPlan) -> Dict:
+        """Apply a plan's creates and updates together, concurrently under the shared rate limiter
+        
+        At most SYNC_WRITE_CONCURRENCY requests are in flight. Per-card failures are
+        gathered rather than aborting the run; throughput is reported in cards/sec.
+        """
+        # Mappings rebuilt while planning are only saved once the plan is applied
+        if plan.adopted:
+            self.state.set_mappings(plan.adopted)
+        
+        result = self.empty_result()
+        result['total'] = len(plan.source_cards)
+        result['skipped'] = len(plan.updates) + len(plan.noops)
+        result['unchanged'] = len(plan.noops)
+        result['changed'] = len(plan.updates)
+        result['orphaned'] = len(plan.orphans)
+        
+        if plan.creates or plan.updates:
+            started = time.perf_counter()
+            create_results, update_results = asyncio.run(self._execute_plan_concurrently(plan))
+            elapsed = time.perf_counter() - started
+            
+            for (source_card, target_list_id), outcome in zip(plan.creates, create_results):
+                if isinstance(outcome, Exception):
+                    result['failures'].append(self._describe_failure('create', source_card, outcome))
+                else:
+                    result['synced'] += 1
+            for (source_card, mapping), outcome in zip(plan.updates, update_results):
+                if isinstance(outcome, Exception):
+                    result['failures'].append(self._describe_failure('update', source_card, outcome))
+                elif outcome is not None:
+                    result['written'] += 1
+            
+            result['failed'] = len(result['failures'])
+            written = result['synced'] + result['written']
+            result['cards_per_sec'] = written / elapsed if elapsed > 0 else 0.0
+            print(f"⚡ Wrote {written} master cards in {elapsed:.1f}s ({result['cards_per_sec']:.1f} cards/sec)")
         
         print("\n" + "=" * 50)
         print(f"🎉 Sync Complete!")
-        print(f"✅ Synced: {synced_count} cards")
-        print(f"⏭️  Skipped: {skipped_count} cards (already exist)")
-        print(f"📊 Total processed: {len(source_cards)} cards")
+        print(f"✅ Synced: {result['synced']} cards")
+        print(f"✏️  Updated: {result['written']} cards ({result['unchanged']} unchanged)")
+        if result['failed']:
+            print(f"❌ Failed: {result['failed']} cards")
+        print(f"📊 Total processed: {result['total']} cards")
         
+        return result
+    
+    def reconcile(self, source_cards: List[Dict], boards: Optional[List[str]] = None, adopt: bool = True) -> Dict:
+        """Plan and apply one run against a single snapshot of the source cards"""
+        return self.execute_plan(self.build_plan(source_cards, boards=boards, adopt=adopt))
+    
+    def _describe_failure(self, action: str, source_card: Dict, error: Exception) -> Dict:
+        card_name = f"[{source_card['source_board'].upper()}] {source_card['name']}"
+        # aiohttp's message embeds the request URL, auth params included
+        if isinstance(error, aiohttp.ClientResponseError):
+            message = f"HTTP {error.status}: {error.message}"
+        else:
+            message = str(error)
+        print(f"❌ Error {'creating' if action == 'create' else 'updating'} sync card {card_name}: {message}")
         return {
-            'synced': synced_count,
-            'skipped': skipped_count,
-            'total': len(source_cards)
+            'action': action,
+            'source_card_id': source_card['id'],
+            'source_board': source_card['source_board'],
+            'name': card_name,
+            'error': message
         }
     
-    def update_existing_sync_cards(self):
-        """Update existing sync cards with latest information"""
-        print("🔄 Updating existing sync cards...")
+    async def _execute_plan_concurrently(self, plan: SyncPlan) -> Tuple[List, List]:
+        """Run every create and update in one event loop; failures are returned in place"""
+        async with AsyncTrelloClient(max_concurrency=TrelloConfig.SYNC_WRITE_CONCURRENCY) as client:
+            positions = await self._assign_positions(client, plan.creates)
+            creates = [
+                self._create_master_card(client, source_card, target_list_id, pos)
+                for (source_card, target_list_id), pos in zip(plan.creates, positions)
+            ]
+            updates = [self._update_master_card(client, source_card, mapping) for source_card, mapping in plan.updates]
+            outcomes = await asyncio.gather(*creates, *updates, return_exceptions=True)
+            return outcomes[:len(creates)], outcomes[len(creates):]
+    
+    async def _assign_positions(self, client: AsyncTrelloClient, creates: List[Tuple[Dict, str]]) -> List[Optional[float]]:
+        """Explicit positions after each list's current last card, in source order"""
+        list_ids = list(dict.fromkeys(target_list_id for _, target_list_id in creates))
+        list_cards = await asyncio.gather(
+            *(client.get_list_cards(list_id, projection=self.LIST_POSITION_PROJECTION) for list_id in list_ids),
+            return_exceptions=True
+        )
         
-        # Get all cards from source boards
-        source_cards = self.get_all_cards_from_source_boards()
+        next_pos = {}
+        for list_id, cards in zip(list_ids, list_cards):
+            if isinstance(cards, Exception):
+                print(f"⚠️  Could not read card positions in list {list_id}, appending at the bottom")
+                continue
+            next_pos[list_id] = max((card['pos'] for card in cards), default=0)
         
-        # Get master board cards
+        # Syncs writing to the same lists at once (card shards of one board) can read the
+        # same tail: positions start on the next whole step and each slot keeps its own
+        # fraction of a step, so two slots never produce the same position
+        offset = self.position_slot * self.POSITION_STEP / self.position_slots
+        for list_id, tail in next_pos.items():
+            next_pos[list_id] = (tail // self.POSITION_STEP) * self.POSITION_STEP
+        
+        positions = []
+        for _, target_list_id in creates:
+            pos = None
+            if target_list_id in next_pos:
+                next_pos[target_list_id] += self.POSITION_STEP
+                pos = next_pos[target_list_id] + offset
+            positions.append(pos)
+        return positions
+    
+    async def _create_master_card(self, client: AsyncTrelloClient, source_card: Dict, target_list_id: str,
+                                  pos: Optional[float]) -> Dict:
+        card_name, new_desc = self.render_master_card(source_card)
+        new_card = await client.create_card(list_id=target_list_id, name=card_name, desc=new_desc, pos=pos)
+        self._record_created(source_card, new_card)
+        print(f"✅ Created sync card: {card_name}")
+        return new_card
+    
+    async def _update_master_card(self, client: AsyncTrelloClient, source_card: Dict, mapping: Dict) -> Optional[Dict]:
+        """PUT the latest name and description; None if the master copy no longer exists"""
+        # Name follows source renames; description gets the latest sync info
+        card_name, new_desc = self.render_master_card(source_card)
         try:
-            master_cards = self.client.get_board_cards(self.boards['master'])
-        except Exception as e:
-            print(f"❌ Error getting master cards: {e}")
-            return
+            updated = await client._make_request(
+                f"cards/{mapping['master_card_id']}",
+                method='PUT',
+                data={'name': card_name, 'desc': new_desc}
+            )
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                raise
+            # Master copy was deleted; the next sync recreates it
+            self.state.remove_mapping(source_card['id'])
+            print(f"🗑️  Master copy of {card_name} is gone, will recreate")
+            return None
         
-        # Create lookup for source cards
-        source_lookup = {}
-        for card in source_cards:
-            key = f"[{card['source_board'].upper()}] {card['name']}"
-            source_lookup[key] = card
-        
-        # Update master cards that have corresponding source cards
-        updated_count = 0
-        
-        for master_card in master_cards:
-            if master_card['name'] in source_lookup:
-                source_card = source_lookup[master_card['name']]
-                
-                # Update description with latest sync info
-                original_desc = source_card.get('desc', '')
-                sync_info = f"🔄 Synced from {source_card['source_board']} board\n"
-                sync_info += f"📅 Last synced: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
-                sync_info += f"🔗 Original card: {source_card['url']}\n\n"
-                
-                new_desc = sync_info + original_desc
-                
-                try:
-                    # Update the card description
-                    self.client._make_request(
-                        f"cards/{master_card['id']}",
-                        method='PUT',
-                        data={'desc': new_desc}
-                    )
-                    print(f"✅ Updated: {master_card['name']}")
-                    updated_count += 1
-                except Exception as e:
-                    print(f"❌ Error updating {master_card['name']}: {e}")
-        
-        print(f"🎉 Updated {updated_count} existing sync cards")
+        self.state.set_mapping(
+            source_card['id'], mapping['master_card_id'], source_card['source_board'],
+            self.content_hash(source_card), datetime.now(timezone.utc).isoformat()
+        )
+        print(f"✅ Updated: {card_name}")
+        return updated
+    
+    def sync_cards_to_master(self, source_cards: Optional[List[Dict]] = None):
+        """Create master copies of source cards that don't have one yet"""
+        print("🔄 Starting Trello Board Sync...")
+        print("=" * 50)
+        
+        if source_cards is None:
+            plan = self.plan()
+        else:
+            plan = self.build_plan(source_cards)
+        return self.execute_plan(replace(plan, updates=[]))
+    
+    def update_existing_sync_cards(self, source_cards: Optional[List[Dict]] = None) -> Dict:
+        """Update existing sync cards whose source content changed since the last sync"""
+        print("🔄 Updating existing sync cards...")
+        
+        if source_cards is None:
+            plan = self.plan()
+        else:
+            plan = self.build_plan(source_cards)
+        return self.execute_plan(replace(plan, creates=[]))
+    
+    @staticmethod
+    def empty_result() -> Dict:
+        return {'synced': 0, 'skipped': 0, 'failed': 0, 'failures': [], 'cards_per_sec': 0.0, 'total': 0,
+                'unchanged': 0, 'changed': 0, 'written': 0, 'orphaned': 0,
+                'full_scan': False, 'actions_by_board': {}}
     
     def run_full_sync(self):
         """Run complete sync: create new cards and update existing ones"""
         print("🚀 Running Full Trello Sync")
         print("=" * 50)
         
-        # First, sync new cards
-        sync_result = self.sync_cards_to_master()
+        # Every source board is read once; creates and updates come from one plan
+        return self.execute_plan(self.plan())
+    
+    def run_full_scan(self):
+        """Full sync that also resets the incremental cursors
         
-        # Then, update existing cards
-        self.update_existing_sync_cards()
+        Each board's newest action is captured before scanning, so anything that changes
+        during the scan is replayed by the next incremental run.
+        """
+        heads = {}
+        for board_name in self.SOURCE_BOARDS:
+            board_id = self.boards[board_name]
+            try:
+                actions = self.client.get_board_actions(
+                    board_id, action_filter=self.CARD_ACTION_TYPES, limit=1, fields='id,date'
+                )
+                heads[board_name] = actions[0] if actions else None
+            except Exception as e:
+                print(f"❌ Error reading latest action for {board_name}: {e}")
+        
+        scan_started = datetime.now(timezone.utc).isoformat()
+        print("🚀 Running Full Trello Sync")
+        print("=" * 50)
+        source_cards = self.get_all_cards_from_source_boards()
+        # Unchanged cards are never written, so deleted master copies are only noticed here
+        self.rebuild_card_mapping(source_cards)
+        sync_result = self.reconcile(source_cards, boards=self.last_changed_boards)
+        
+        # Boards that failed to load, or had cards fail to sync, keep their old cursor
+        complete = set(self.last_changed_boards) - self.boards_with_failures(sync_result)
+        for board_name, head in heads.items():
+            if board_name not in complete:
+                continue
+            if head:
+                self.state.set_cursor(self.boards[board_name], board_name, head['id'], head['date'])
+            else:
+                # No card actions yet; start from the scan time
+                self.state.set_cursor(self.boards[board_name], board_name, None, scan_started)
+        if complete.issuperset(self.SOURCE_BOARDS) and len(heads) == len(self.SOURCE_BOARDS):
+            self.state.set_meta('last_full_scan', scan_started)
+        else:
+            # Cards the scan missed may never show up in new actions; scan again next run
+            print(f"⚠️  Full scan incomplete for {', '.join(sorted(set(self.SOURCE_BOARDS) - (complete & set(heads))))}")
+        
+        sync_result['full_scan'] = True
+        return sync_result
+    
+    def _full_scan_due(self, interval: float) -> bool:
+        """A full scan is needed if any board has no cursor or the last one is too old"""
+        if any(self.state.get_cursor(self.boards[name]) is None for name in self.SOURCE_BOARDS):
+            return True
+        
+        last_full_scan = self.state.get_meta('last_full_scan')
+        if not last_full_scan:
+            return True
+        elapsed = datetime.now(timezone.utc) - datetime.fromisoformat(last_full_scan)
+        return elapsed.total_seconds() >= interval
+    
+    def run_incremental_sync(self, full_scan_interval: float = None, boards: Optional[List[str]] = None):
+        """Apply only the card actions that happened since the last run
+        
+        boards limits the run to some source boards (default: all). Falls back to
+        run_full_scan() on the first run, when the periodic safety-net scan is due, or
+        when a board has more new actions than one page holds. The result's
+        actions_by_board holds the new-action count of each board polled.
+        """
+        print("🚀 Running Incremental Trello Sync")
+        print("=" * 50)
+        
+        interval = full_scan_interval if full_scan_interval is not None else TrelloConfig.SYNC_FULL_SCAN_INTERVAL
+        if self._full_scan_due(interval):
+            print("🧹 Full scan due, re-scanning all boards")
+            return self.run_full_scan()
+        
+        touched = {}  # card id -> source board name, in first-seen order
+        heads = {}  # board name -> newest action processed
+        action_counts = {}  # board name -> new actions seen
+        
+        for board_name in boards or self.SOURCE_BOARDS:
+            board_id = self.boards[board_name]
+            cursor = self.state.get_cursor(board_id)
+            try:
+                actions = self.client.get_board_actions(
+                    board_id,
+                    since=cursor['last_action_id'] or cursor['last_action_date'],
+                    action_filter=self.CARD_ACTION_TYPES,
+                    limit=self.ACTIONS_PAGE_LIMIT,
+                    fields='id,type,date,data'
+                )
+            except Exception as e:
+                # Cursor stays put, so these actions are retried next run
+                print(f"❌ Error getting actions for {board_name}: {e}")
+                continue
+            
+            if len(actions) >= self.ACTIONS_PAGE_LIMIT:
+                print(f"⚠️  {board_name} has {len(actions)}+ new actions, falling back to a full scan")
+                return self.run_full_scan()
+            
+            action_counts[board_name] = len(actions)
+            if not actions:
+                print(f"💤 No new actions in {board_name}")
+                continue
+            
+            print(f"📋 {len(actions)} new actions in {board_name}")
+            heads[board_name] = actions[0]
+            
+            # Actions arrive newest first; only the set of touched cards matters, since
+            # renames reach the master copy through the id mapping
+            for action in reversed(actions):
+                card_id = action.get('data', {}).get('card', {}).get('id')
+                if card_id:
+                    touched.setdefault(card_id, board_name)
+        
+        if not heads:
+            print("💤 No source board changes, nothing to sync")
+            sync_result = self.empty_result()
+            sync_result['actions_by_board'] = action_counts
+            return sync_result
+        
+        source_cards = self.fetch_source_cards(touched)
+        
+        sync_result = self.reconcile(source_cards)
+        sync_result['actions_by_board'] = action_counts
+        
+        # A board's actions are replayed next run unless all its cards were read and applied
+        incomplete = self.last_failed_boards | self.boards_with_failures(sync_result)
+        for board_name, head in heads.items():
+            if board_name in incomplete:
+                print(f"⚠️  Keeping the {board_name} cursor so its failed cards are retried")
+                continue
+            self.state.set_cursor(self.boards[board_name], board_name, head['id'], head['date'])
         
         return sync_result
+    
+    @staticmethod
+    def boards_with_failures(sync_result: Dict) -> set:
+        """Source boards with at least one card that failed to sync"""
+        return {failure['source_board'] for failure in sync_result.get('failures', [])}
+    
+    def fetch_source_cards(self, touched: Dict[str, str]) -> List[Dict]:
+        """Re-read only the cards the new actions touched, skipping deleted, archived or moved-away ones
+        
+        A card is filed under the source board it is on now (from its idBoard),
+        not the board whose action touched it, so a move between source boards
+        syncs straight away. Boards with a card that could not be read (other
+        than a 404) end up in self.last_failed_boards.
+        """
+        card_ids = list(touched)
+        # Batch routes can't carry a comma-separated fields= list, so whole cards are read
+        results = self.client.batch_get([f'/cards/{card_id}' for card_id in card_ids])
+        
+        source_board_names = {self.boards[name]: name for name in self.SOURCE_BOARDS}
+        self.last_failed_boards = set()
+        source_cards = []
+        for card_id, result in zip(card_ids, results):
+            board_name = touched[card_id]
+            if result.status_code == 404:
+                print(f"🗑️  Card {card_id} on {board_name} is gone; master copy left in place")
+                continue
+            if not result.ok:
+                print(f"❌ Error reading card {card_id} on {board_name}: {result.error or result.status_code}")
+                self.last_failed_boards.add(board_name)
+                continue
+            
+            card = result.data
+            board_name = source_board_names.get(card.get('idBoard'))
+            if card.get('closed') or board_name is None:
+                # Matches a full scan, which only sees open cards on the source boards
+                continue
+            card['source_board'] = board_name
+            card['source_board_id'] = card['idBoard']
+            source_cards.append(card)
+        
+        print(f"📊 {len(source_cards)} changed source cards")
+        return source_cards
 
 def main():
     """Main function to run the sync"""
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Trello Sync Scheduler
+Single-flight, coalescing runner for TrelloSync with per-board adaptive polling
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, Set, List
+from trello_sync import TrelloSync
+from trello_sync_state import SyncLock
+from config import TrelloConfig
+
+class AdaptiveSyncScheduler:
+    """Runs at most one sync at a time, here and in any other process sharing the state db
+    
+    Triggers only mark work as pending: a full-scan request absorbs any pending board
+    polls, and triggers that arrive while a sync runs are merged into the next run
+    instead of queueing another. Each source board is polled on its own interval,
+    which halves after a poll that found changes and grows by half after a quiet one.
+    """
+    
+    SPEED_UP = 0.5  # Interval multiplier after a poll with new actions
+    SLOW_DOWN = 1.5  # Interval multiplier after a quiet poll
+    
+    def __init__(self, sync: Optional[TrelloSync] = None, poll: bool = True,
+                 min_interval: float = None, max_interval: float = None, initial_interval: float = None):
+        self.sync = sync or TrelloSync()
+        self.lock = SyncLock(self.sync.state, 'sync')
+        self.poll = poll
+        self.min_interval = min_interval or TrelloConfig.SYNC_POLL_MIN_INTERVAL
+        self.max_interval = max_interval or TrelloConfig.SYNC_POLL_MAX_INTERVAL
+        initial = initial_interval or TrelloConfig.SYNC_POLL_INTERVAL
+        initial = min(max(initial, self.min_interval), self.max_interval)
+        
+        now = time.monotonic()
+        self.intervals: Dict[str, float] = {board: initial for board in self.sync.SOURCE_BOARDS}
+        self.next_due: Dict[str, float] = {board: now for board in self.sync.SOURCE_BOARDS}
+        
+        self._pending_full = False
+        self._pending_boards: Set[str] = set()
+        self._running = False
+        self._state_lock = threading.Lock()
+        
+        # Stats
+        self.runs = 0
+        self.coalesced_triggers = 0
+        self.lock_contentions = 0
+        self.last_result: Optional[Dict] = None
+    
+    def request_full_scan(self):
+        """Ask for a full scan; merged with whatever else is pending"""
+        with self._state_lock:
+            if self._pending_full or self._running:
+                self.coalesced_triggers += 1
+            self._pending_full = True
+    
+    def request_boards(self, *board_names: str):
+        """Ask for an incremental poll of some boards"""
+        with self._state_lock:
+            if self._pending_full or self._pending_boards or self._running:
+                self.coalesced_triggers += 1
+            self._pending_boards.update(board_names)
+    
+    def tick(self) -> Optional[Dict]:
+        """Queue boards whose poll interval has elapsed, then run anything pending"""
+        if self.poll:
+            now = time.monotonic()
+            due = [board for board, at in self.next_due.items()
+                   if at <= now and board not in self._pending_boards]
+            if due:
+                self.request_boards(*due)
+        return self.run_pending()
+    
+    def run_pending(self) -> Optional[Dict]:
+        """Run the pending work as a single sync; returns None if nothing ran"""
+        with self._state_lock:
+            if self._running or not (self._pending_full or self._pending_boards):
+                return None
+            full = self._pending_full
+            boards = sorted(self._pending_boards)
+            self._pending_full = False
+            self._pending_boards = set()
+            self._running = True
+        
+        try:
+            if not self.lock.acquire():
+                # Another process is syncing; keep the work for the next tick
+                self.lock_contentions += 1
+                print("🔒 Another sync is running, will retry")
+                with self._state_lock:
+                    self._pending_full = self._pending_full or full
+                    self._pending_boards.update(boards)
+                return None
+            
+            try:
+                if full:
+                    result = self.sync.run_full_scan()
+                else:
+                    result = self.sync.run_incremental_sync(boards=boards)
+            except Exception:
+                # Don't retry a failing board on every tick; wait out its interval
+                self._adapt({}, boards)
+                raise
+            finally:
+                self.lock.release()
+            
+            self.runs += 1
+            self.last_result = result
+            self._adapt(result, boards)
+            return result
+        finally:
+            with self._state_lock:
+                self._running = False
+    
+    def _adapt(self, result: Dict, polled: List[str]):
+        """Reschedule boards based on what the run found"""
+        now = time.monotonic()
+        if result.get('full_scan'):
+            # Every board was just read; poll each again after its current interval
+            for board in self.intervals:
+                self.next_due[board] = now + self.intervals[board]
+            return
+        
+        counts = result.get('actions_by_board', {})
+        for board in polled:
+            if board in counts:
+                factor = self.SPEED_UP if counts[board] else self.SLOW_DOWN
+                interval = self.intervals[board] * factor
+                self.intervals[board] = min(max(interval, self.min_interval), self.max_interval)
+            # Boards that errored keep their interval and are retried after it
+            self.next_due[board] = now + self.intervals[board]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'runs': self.runs,
+            'coalesced_triggers': self.coalesced_triggers,
+            'lock_contentions': self.lock_contentions,
+            'running': self._running,
+            'boards': {
+                board: {
+                    'interval_seconds': round(self.intervals[board]),
+                    'due_in_seconds': max(0, round(self.next_due[board] - now))
+                }
+                for board in self.intervals
+            }
+        }
@@ -0,0 +1,205 @@
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, List, Iterable, Tuple
+from config import TrelloConfig
+
+class SyncStateStore:
+    """SQLite-backed state that lets TrelloSync pick up where the last run stopped"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS board_cursors (
+            board_id TEXT PRIMARY KEY,
+            board_name TEXT,
+            last_action_id TEXT,
+            last_action_date TEXT,
+            updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sync_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS card_map (
+            source_card_id TEXT PRIMARY KEY,
+            master_card_id TEXT NOT NULL,
+            source_board TEXT,
+            content_hash TEXT,
+            last_synced TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_card_map_master ON card_map (master_card_id);
+        CREATE TABLE IF NOT EXISTS locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, path: str = None):
+        self.path = path or TrelloConfig.SYNC_STATE_DB
+        # Several processes (scheduler, webhook worker, partitioned sync workers) may share the file
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+    
+    def get_cursor(self, board_id: str) -> Optional[Dict]:
+        """Last processed action for a board, or None if it was never synced incrementally"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM board_cursors WHERE board_id = ?', (board_id,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def set_cursor(self, board_id: str, board_name: str, action_id: Optional[str], action_date: Optional[str]):
+        """Record the newest action applied for a board"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO board_cursors (board_id, board_name, last_action_id, last_action_date, updated_at)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(board_id) DO UPDATE SET
+                       board_name = excluded.board_name,
+                       last_action_id = excluded.last_action_id,
+                       last_action_date = excluded.last_action_date,
+                       updated_at = excluded.updated_at""",
+                (board_id, board_name, action_id, action_date, datetime.now().isoformat())
+            )
+    
+    def clear_cursors(self):
+        """Forget every cursor so the next incremental run starts with a full scan"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM board_cursors')
+    
+    def get_mapping(self, source_card_id: str) -> Optional[Dict]:
+        """Master card mapped to a source card, with its content hash and last sync time"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM card_map WHERE source_card_id = ?', (source_card_id,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def get_mappings(self, source_card_ids: Iterable[str] = None) -> Dict[str, Dict]:
+        """Mappings keyed by source card id (all of them when no ids are given)"""
+        with self._lock:
+            if source_card_ids is None:
+                rows = self._conn.execute('SELECT * FROM card_map').fetchall()
+            else:
+                ids = list(source_card_ids)
+                rows = []
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows.extend(self._conn.execute(
+                        f'SELECT * FROM card_map WHERE source_card_id IN ({placeholders})', chunk
+                    ).fetchall())
+        return {row['source_card_id']: dict(row) for row in rows}
+    
+    def set_mapping(self, source_card_id: str, master_card_id: str, source_board: str,
+                    content_hash: Optional[str] = None, last_synced: Optional[str] = None):
+        """Record (or replace) the master card for a source card"""
+        self.set_mappings([(source_card_id, master_card_id, source_board, content_hash, last_synced)])
+    
+    def set_mappings(self, rows: List[Tuple[str, str, str, Optional[str], Optional[str]]]):
+        """Bulk upsert of (source id, master id, source board, content hash, last synced) rows"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO card_map (source_card_id, master_card_id, source_board, content_hash, last_synced)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(source_card_id) DO UPDATE SET
+                       master_card_id = excluded.master_card_id,
+                       source_board = excluded.source_board,
+                       content_hash = excluded.content_hash,
+                       last_synced = excluded.last_synced""",
+                rows
+            )
+    
+    def remove_mapping(self, source_card_id: str):
+        """Forget a source card's master copy (e.g. it was deleted on the master board)"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM card_map WHERE source_card_id = ?', (source_card_id,))
+    
+    def count_mappings(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM card_map').fetchone()[0]
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM sync_meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+    
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO sync_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                (key, value)
+            )
+    
+    def try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        """Take (or renew) a named lease unless another owner holds an unexpired one
+        
+        A single upsert, so it is atomic across every process sharing the database.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO locks (name, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(name) DO UPDATE SET
+                       owner = excluded.owner,
+                       acquired_at = excluded.acquired_at,
+                       expires_at = excluded.expires_at
+                   WHERE locks.owner = excluded.owner OR locks.expires_at < excluded.acquired_at""",
+                (name, owner, now, now + ttl)
+            )
+            row = self._conn.execute('SELECT owner FROM locks WHERE name = ?', (name,)).fetchone()
+        return row is not None and row['owner'] == owner
+    
+    def unlock(self, name: str, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM locks WHERE name = ? AND owner = ?', (name, owner))
+    
+    def close(self):
+        self._conn.close()
+
+class SyncLock:
+    """Single-flight lease over the sync state database, honoured by every process using it
+    
+    Leases expire after ttl seconds so a crashed holder cannot block syncing forever.
+    """
+    
+    POLL_INTERVAL = 1.0  # Seconds between attempts while blocking
+    
+    def __init__(self, store: SyncStateStore, name: str = 'sync', ttl: float = None):
+        self.store = store
+        self.name = name
+        self.ttl = ttl or TrelloConfig.SYNC_LOCK_TTL
+        self.owner = uuid.uuid4().hex
+        self.held = False
+    
+    def acquire(self, blocking: bool = False, timeout: Optional[float] = None) -> bool:
+        """Take the lock; with blocking, keep trying until timeout (None waits forever)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.store.try_lock(self.name, self.owner, self.ttl):
+                self.held = True
+                return True
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(self.POLL_INTERVAL)
+    
+    def release(self):
+        if self.held:
+            self.store.unlock(self.name, self.owner)
+            self.held = False
+    
+    def __enter__(self):
+        if not self.acquire(blocking=True):
+            raise RuntimeError(f"Could not acquire sync lock '{self.name}'")
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
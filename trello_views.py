@@ -1,5 +1,9 @@
-from typing import List, Dict, Optional
-from trello_client import TrelloClient
+import threading
+from typing import List, Dict, Optional, Any
+from config import TrelloConfig
+from trello_client import get_shared_client
+from trello_fields import VIEW_MANAGER_PROJECTION
+from trello_virtual_master import VirtualMasterBoard
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -12,31 +16,154 @@ class ProjectView:
     milestones: List[Dict]
 
 class TrelloViewManager:
-    """Manages dynamic views of the master board"""
+    """Manages dynamic views of the master board
     
-    def __init__(self, master_board_id: str):
-        self.client = TrelloClient()
+    With a virtual_master the source boards' cards are merged into the view on
+    read instead of being copied onto the master board by TrelloSync.
+    """
+    
+    def __init__(self, master_board_id: str, virtual_master: Optional[VirtualMasterBoard] = None):
+        self.client = get_shared_client()
         self.master_board_id = master_board_id
+        self.virtual_master = virtual_master
+        self.cache_ttl = TrelloConfig.VIEW_CACHE_TTL
         self._cache = {}
         self._cache_time = None
+        self._cache_lock = threading.Lock()
+        self.patched_events = 0
+        self.invalidations = 0
     
     def _get_board_data(self, force_refresh: bool = False):
         """Get board data with caching"""
         now = datetime.now()
-        if not force_refresh and self._cache_time and (now - self._cache_time).seconds < 300:  # 5 min cache
+        with self._cache_lock:
+            # Patches replace the cached dict rather than modifying it, so it is safe to hand out
+            if not force_refresh and self._cache_time and (now - self._cache_time).total_seconds() < self.cache_ttl:
+                return self._cache
+        
+        if self.virtual_master:
+            # Master board plus every source board, fetched concurrently and merged here
+            snapshot = self.virtual_master.get_snapshot(self.master_board_id)
+        else:
+            # Board, lists, cards (with custom field items), labels and custom field definitions in one request
+            snapshot = self.client.get_board_snapshot(
+                self.master_board_id,
+                include=('lists', 'cards', 'card_custom_fields', 'card_members', 'labels', 'custom_fields'),
+                fields=VIEW_MANAGER_PROJECTION
+            )
+        
+        with self._cache_lock:
+            self._cache = {
+                'board': snapshot.board,
+                'lists': snapshot.lists,
+                'cards': snapshot.cards,
+                'labels': snapshot.labels,
+                'custom_fields': snapshot.custom_fields
+            }
+            # A virtual master view missing a source board is served but not cached, so the next view retries it
+            self._cache_time = None if snapshot.board.get('failed_boards') else now
             return self._cache
+    
+    def invalidate_cache(self):
+        """Force the next view to refetch the board"""
+        with self._cache_lock:
+            self._cache_time = None
+            self.invalidations += 1
+    
+    def handle_webhook_event(self, event: Dict[str, Any]):
+        """Webhook listener: patch the cached board in place, or invalidate it if we can't"""
+        if self.virtual_master and self.virtual_master.is_source_board(event.get('board_id')):
+            event = self.virtual_master.adapt_event(event)
+        elif event.get('board_id') != self.master_board_id:
+            return
+        
+        if event.get('late'):
+            # Arrived after newer events for the card were applied; patching would undo them
+            self.invalidate_cache()
+            return
+        
+        with self._cache_lock:
+            if not self._cache_time:
+                return  # Nothing cached yet, the next view fetches fresh data
+            if self._patch_cache(event):
+                self.patched_events += 1
+                return
+        
+        self.invalidate_cache()
+    
+    def _patch_cache(self, event: Dict[str, Any]) -> bool:
+        """Apply a card event to the cached cards; False if it can't be applied locally
+        
+        Views and jsonify read the cached data without the lock, so the published
+        cards are never modified: the patch goes into a copy that is swapped in
+        (the caller holds the lock).
+        """
+        cards = self._apply_card_event(list(self._cache.get('cards', [])), event)
+        if cards is None:
+            return False
+        self._cache = {**self._cache, 'cards': cards}
+        return True
+    
+    def _apply_card_event(self, cards: List[Dict], event: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Patched copy of the card list, or None if the event needs a refetch"""
+        action = event.get('action')
+        index = next((i for i, c in enumerate(cards) if c['id'] == event.get('card_id')), None)
+        
+        if action == 'card_created':
+            if index is None:
+                cards.append({
+                    'id': event.get('card_id'),
+                    'name': event.get('card_name', ''),
+                    'idList': event.get('list_id'),
+                    'desc': '',
+                    'due': None,
+                    'closed': False,
+                    'labels': [],
+                    'members': [],
+                    'customFieldItems': []
+                })
+            return cards
         
-        board = self.client.get_board(self.master_board_id)
-        lists = self.client.get_board_lists(self.master_board_id)
-        cards = self.client.get_board_cards(self.master_board_id)
+        if action in ('card_deleted', 'card_moved'):
+            if index is not None:
+                del cards[index]
+            return cards
         
-        self._cache = {
-            'board': board,
-            'lists': lists,
-            'cards': cards
-        }
-        self._cache_time = now
-        return self._cache
+        if index is None:
+            # Not in the cache (e.g. a card was reopened); only a refetch can tell us about it
+            return None
+        
+        card = dict(cards[index])
+        cards[index] = card
+        
+        if action == 'card_updated':
+            card.update(event.get('updates', {}))
+            if card.get('closed'):
+                # The cache only holds open cards, as a fresh fetch would
+                del cards[index]
+            return cards
+        
+        if action == 'label_added':
+            label = event.get('label', {})
+            if all(existing.get('id') != label.get('id') for existing in card.get('labels', [])):
+                card['labels'] = card.get('labels', []) + [label]
+            return cards
+        
+        if action == 'label_removed':
+            label_id = event.get('label', {}).get('id')
+            card['labels'] = [existing for existing in card.get('labels', []) if existing.get('id') != label_id]
+            return cards
+        
+        if action == 'member_added':
+            if all(member.get('id') != event.get('member_id') for member in card.get('members', [])):
+                card['members'] = card.get('members', []) + [{'id': event.get('member_id'), 'fullName': event.get('member_name')}]
+            return cards
+        
+        if action == 'member_removed':
+            card['members'] = [member for member in card.get('members', []) if member.get('id') != event.get('member_id')]
+            return cards
+        
+        return None
     
     def create_client_view(self, client_name: str) -> ProjectView:
         """Create a view filtered by client"""
@@ -135,16 +262,37 @@ class TrelloViewManager:
             milestones=[]
         )
     
-    def _get_custom_field_value(self, card: Dict, field_name: str) -> Optional[str]:
-        """Extract custom field value from card"""
-        # This would need to be implemented based on how custom fields are stored
-        # For now, we'll check card name patterns or custom field data
-        custom_fields = card.get('customFieldItems', [])
-        for field in custom_fields:
-            if field.get('idCustomField') == field_name:
-                return field.get('value', {}).get('text', '')
+    def get_cached_project(self, card_id: Optional[str]) -> Optional[str]:
+        """A card's project from the cached board, without fetching anything"""
+        with self._cache_lock:
+            cache = self._cache
+        card = next((c for c in cache.get('cards', []) if c['id'] == card_id), None)
+        return self._resolve_custom_field(card, cache.get('custom_fields', []), 'Project') if card else None
+    
+    @staticmethod
+    def _resolve_custom_field(card: Dict, definitions: List[Dict], field_name: str) -> Optional[str]:
+        """A card's custom field value by field name, using the board's field definitions
+        
+        Card items only carry the field id, and list fields only the chosen option's
+        id (idValue), so both are looked up in the definitions.
+        """
+        fields = {definition['id']: definition for definition in definitions if definition.get('name') == field_name}
+        for item in card.get('customFieldItems', []):
+            definition = fields.get(item.get('idCustomField'))
+            if definition is None:
+                continue
+            if item.get('idValue'):
+                return next((option.get('value', {}).get('text') for option in definition.get('options', [])
+                             if option.get('id') == item['idValue']), None)
+            return (item.get('value') or {}).get('text')
         return None
     
+    def _get_custom_field_value(self, card: Dict, field_name: str) -> Optional[str]:
+        """Extract custom field value from card, using the cached board's field definitions"""
+        with self._cache_lock:
+            definitions = self._cache.get('custom_fields', [])
+        return self._resolve_custom_field(card, definitions, field_name)
+    
     def _extract_milestones(self, lists: List[Dict], cards: List[Dict]) -> List[Dict]:
         """Extract milestone information from lists and cards"""
         milestones = []
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Virtual Master Board
+Builds the master board view in-process from the source boards instead of copying cards onto it
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any
+from trello_async_client import AsyncTrelloClient
+from trello_client import BoardSnapshot
+from trello_fields import VIEW_MANAGER_PROJECTION
+from trello_sync import TrelloSync, ORIGINAL_CARD_RE
+
+class VirtualMasterBoard:
+    """The master board as TrelloSync would leave it, computed from source board snapshots
+    
+    The real master board only keeps its own cards (milestones, features, tasks
+    created from the dashboard). Source cards are merged in on read: named
+    "[BOARD] name" and placed in the master list from list_mapping, with their
+    origin under a 'source' key. A virtual list stands in for any mapped list the
+    master board doesn't have. Nothing is ever written to Trello.
+    """
+    
+    SNAPSHOT_INCLUDE = ('lists', 'cards', 'card_custom_fields', 'card_members', 'labels', 'custom_fields')
+    VIRTUAL_LIST_PREFIX = 'virtual:'
+    
+    def __init__(self, projection=VIEW_MANAGER_PROJECTION):
+        self.projection = projection
+        
+        # Source boards merged into the master view
+        self.boards = {
+            'design': '68e57202502c6ecc0ddac4ed',
+            'ux_review': '68e572b90e5306124115d227',
+            'ilitigate_dev': '68e56a57b40a3273ba4d09e6',
+            'account_management': '68e95255081b416a51143bc6'
+        }
+        
+        # Mapping of source boards to master board lists (as in TrelloSync)
+        self.list_mapping = {
+            'design': '🎨 Design Tasks',
+            'ux_review': '🔍 UX Tasks',
+            'ilitigate_dev': '💻 Dev Tasks',
+            'account_management': '📋 Features'
+        }
+        
+        self.board_names = {board_id: name for name, board_id in self.boards.items()}
+        # Source board name -> id of the list its cards appear in, set by each build
+        self.target_lists: Dict[str, str] = {}
+    
+    def is_source_board(self, board_id: Optional[str]) -> bool:
+        return board_id in self.board_names
+    
+    def get_snapshot(self, master_board_id: str) -> BoardSnapshot:
+        """Fetch the master board and every source board concurrently, then merge them
+        
+        A source board that fails to load is left out and listed under the board's
+        'failed_boards' (name -> error); only a master board failure raises.
+        """
+        master, *results = asyncio.run(self._fetch_snapshots(master_board_id))
+        if isinstance(master, Exception):
+            raise master
+        
+        sources, failed = {}, {}
+        for board_name, snapshot in zip(TrelloSync.SOURCE_BOARDS, results):
+            if isinstance(snapshot, Exception):
+                print(f"❌ Error getting {board_name} for the virtual master board: {snapshot}")
+                failed[board_name] = str(snapshot)
+            else:
+                sources[board_name] = snapshot
+        
+        merged = self.build(master, sources)
+        merged.board['failed_boards'] = failed
+        return merged
+    
+    async def _fetch_snapshots(self, master_board_id: str) -> List[Any]:
+        board_ids = [master_board_id] + [self.boards[name] for name in TrelloSync.SOURCE_BOARDS]
+        async with AsyncTrelloClient() as client:
+            return await asyncio.gather(
+                *(client.get_board_snapshot(board_id, include=self.SNAPSHOT_INCLUDE, fields=self.projection)
+                  for board_id in board_ids),
+                return_exceptions=True
+            )
+    
+    def build(self, master: BoardSnapshot, sources: Dict[str, BoardSnapshot]) -> BoardSnapshot:
+        """Merge source board snapshots into the master board snapshot"""
+        built_at = datetime.now(timezone.utc).isoformat()
+        
+        lists = list(master.lists)
+        list_ids = {lst['name']: lst['id'] for lst in lists}
+        target_lists = {}
+        for board_name in TrelloSync.SOURCE_BOARDS:
+            list_name = self.list_mapping[board_name]
+            if list_name not in list_ids:
+                list_ids[list_name] = self.VIRTUAL_LIST_PREFIX + board_name
+                lists.append({
+                    'id': list_ids[list_name],
+                    'name': list_name,
+                    'closed': False,
+                    'pos': (lists[-1].get('pos', 0) if lists else 0) + TrelloSync.POSITION_STEP,
+                    'virtual': True
+                })
+            target_lists[board_name] = list_ids[list_name]
+        self.target_lists = target_lists
+        
+        # Physical copies left by TrelloSync would show every source card twice
+        cards = [card for card in master.cards if not ORIGINAL_CARD_RE.search(card.get('desc') or '')]
+        labels = list(master.labels)
+        # Source cards keep their own boards' custom field ids, so their definitions come along
+        custom_fields = list(master.custom_fields)
+        members = {member['id']: member for member in master.members}
+        
+        for board_name, snapshot in sources.items():
+            source_lists = {lst['id']: lst.get('name') for lst in snapshot.lists}
+            for card in snapshot.cards:
+                cards.append(self.to_master_card(board_name, card, source_lists.get(card.get('idList')), built_at))
+            labels.extend(snapshot.labels)
+            custom_fields.extend(snapshot.custom_fields)
+            members.update((member['id'], member) for member in snapshot.members)
+        
+        board = dict(master.board)
+        board['virtual'] = True
+        board['built_at'] = built_at
+        board['source_boards'] = list(sources)
+        return BoardSnapshot(
+            board_id=master.board_id,
+            board=board,
+            lists=lists,
+            cards=cards,
+            labels=labels,
+            custom_fields=custom_fields,
+            members=list(members.values())
+        )
+    
+    def to_master_card(self, board_name: str, card: Dict, source_list_name: Optional[str] = None,
+                       synced_at: Optional[str] = None) -> Dict:
+        """A source card as it appears on the virtual master board (ids stay the source's)"""
+        master_card = dict(card)
+        master_card['name'] = f"[{board_name.upper()}] {card.get('name', '')}"
+        master_card['idList'] = self.target_lists.get(board_name, self.VIRTUAL_LIST_PREFIX + board_name)
+        master_card['source'] = {
+            'board': board_name,
+            'board_id': self.boards[board_name],
+            'card_id': card['id'],
+            'list_id': card.get('idList'),
+            'list_name': source_list_name,
+            'url': card.get('url'),
+            'synced_at': synced_at or datetime.now(timezone.utc).isoformat()
+        }
+        return master_card
+    
+    def adapt_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Rewrite a source-board webhook event as the matching virtual master board event"""
+        board_name = self.board_names[event['board_id']]
+        adapted = dict(event)
+        if 'card_name' in adapted:
+            adapted['card_name'] = f"[{board_name.upper()}] {adapted['card_name']}"
+        if adapted.get('list_id'):
+            adapted['list_id'] = self.target_lists.get(board_name, self.VIRTUAL_LIST_PREFIX + board_name)
+        
+        updates = dict(adapted.get('updates') or {})
+        if 'name' in updates:
+            updates['name'] = f"[{board_name.upper()}] {updates['name']}"
+        if 'idList' in updates:
+            # A move between lists of one source board stays in the same master list
+            updates.pop('idList')
+        if 'updates' in adapted:
+            adapted['updates'] = updates
+        return adapted
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Trello Webhook Handler
+Turns Trello webhook actions into normalized events for the registered listeners
+"""
+
+from trello_client import get_shared_client
+from trello_webhook_order import RecentActionIndex, CardEventSequencer
+import logging
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class TrelloWebhookHandler:
+    """Handles incoming webhook notifications from Trello"""
+    
+    def __init__(self):
+        self.client = get_shared_client()
+        
+        # Board IDs for your 6-board structure
+        self.boards = {
+            'weekly_planning': '68e572002006cc67fa8d92c6',
+            'design': '68e57202502c6ecc0ddac4ed', 
+            'ux_review': '68e572b90e5306124115d227',
+            'ilitigate_dev': '68e56a57b40a3273ba4d09e6',
+            'master': '68e572c6443f3eb8f3009115',
+            'account_management': '68e95255081b416a51143bc6'
+        }
+        
+        # Track active webhooks
+        self.active_webhooks = {}
+        
+        # Callbacks that receive every normalized event (cache patching, sync, push...)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        # Callbacks that see each event as handled, before reordering and coalescing
+        self._recorders: List[Callable[[Dict[str, Any]], None]] = []
+        
+        # Trello redelivers and reorders webhooks: drop repeated action ids, and
+        # hand each card's events to listeners in action order, bursts coalesced
+        self.recent_actions = RecentActionIndex()
+        self.sequencer = CardEventSequencer(self._notify_listeners)
+        self.duplicates = 0
+    
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Register a callback for normalized webhook events
+        
+        Listeners get the dict handle_webhook returns, including ignored action types,
+        and always find action_type, action_id, action_date, board_id and card_id
+        (None for non-card actions) in it. Each action reaches them once, and a card's
+        events arrive in action order after a short reorder window; an event that
+        turned up too late to be put in place carries late=True. Bursts of
+        card_updated events are merged into one net update listing the merged
+        action_ids, with 'coalesced' set to how many there were.
+        """
+        self._listeners.append(listener)
+    
+    def add_recorder(self, recorder: Callable[[Dict[str, Any]], None]):
+        """Register a callback that gets every new event as soon as it is handled
+        
+        Unlike listeners, recorders see each action individually, before the reorder
+        and coalescing window (redeliveries are still dropped), which is what an
+        event history needs.
+        """
+        self._recorders.append(recorder)
+    
+    def _notify_listeners(self, event: Dict[str, Any]):
+        """Pass an event to every listener; one failing listener does not stop the rest"""
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Webhook listener {getattr(listener, '__name__', listener)} failed: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'duplicates': self.duplicates,
+            'reordered': self.sequencer.reordered,
+            'late': self.sequencer.late,
+            'coalesced': self.sequencer.coalesced,
+            'held_for_reorder': self.sequencer.pending()
+        }
+    
+    def create_webhook(self, board_id: str, callback_url: str) -> Dict[str, Any]:
+        """Create a webhook for a specific board"""
+        try:
+            webhook_data = {
+                'description': f'Webhook for board {board_id}',
+                'callbackURL': callback_url,
+                'idModel': board_id
+            }
+            
+            webhook = self.client._make_request(
+                'webhooks',
+                method='POST',
+                data=webhook_data
+            )
+            
+            logger.info(f"Created webhook {webhook['id']} for board {board_id}")
+            return webhook
+            
+        except Exception as e:
+            logger.error(f"Failed to create webhook for board {board_id}: {e}")
+            raise
+    
+    def setup_all_webhooks(self, base_url: str) -> Dict[str, str]:
+        """Set up webhooks for all boards"""
+        webhook_url = f"{base_url}/webhook/trello"
+        webhooks = {}
+        
+        for board_name, board_id in self.boards.items():
+            try:
+                webhook = self.create_webhook(board_id, webhook_url)
+                webhooks[board_name] = webhook['id']
+                self.active_webhooks[webhook['id']] = {
+                    'board_id': board_id,
+                    'board_name': board_name
+                }
+            except Exception as e:
+                logger.error(f"Failed to setup webhook for {board_name}: {e}")
+        
+        return webhooks
+    
+    def handle_webhook(self, webhook_data: Dict[str, Any],
+                       on_released: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        """Process incoming webhook data
+        
+        on_released runs once the event has reached the listeners, which can be
+        after this returns while the sequencer holds it. It is not called when
+        the result's status is 'error'.
+        """
+        try:
+            action = webhook_data.get('action', {})
+            action_type = action.get('type')
+            model = webhook_data.get('model', {})
+            
+            if not self.recent_actions.check_and_add(action.get('id')):
+                self.duplicates += 1
+                logger.info(f"Ignoring redelivered webhook: {action_type} {action.get('id')}")
+                if on_released:
+                    on_released()
+                return {'status': 'duplicate', 'action_type': action_type, 'action_id': action.get('id')}
+            
+            logger.info(f"Received webhook: {action_type} on {model.get('name', 'Unknown')}")
+            
+            # Process different types of actions
+            if action_type == 'createCard':
+                result = self._handle_card_created(action, model)
+            elif action_type == 'updateCard':
+                result = self._handle_card_updated(action, model)
+            elif action_type == 'moveCardFromBoard':
+                result = self._handle_card_moved(action, model)
+            elif action_type == 'deleteCard':
+                result = self._handle_card_deleted(action, model)
+            elif action_type == 'addMemberToCard':
+                result = self._handle_member_added(action, model)
+            elif action_type == 'removeMemberFromCard':
+                result = self._handle_member_removed(action, model)
+            elif action_type == 'addLabelToCard':
+                result = self._handle_label_added(action, model)
+            elif action_type == 'removeLabelFromCard':
+                result = self._handle_label_removed(action, model)
+            else:
+                logger.info(f"Unhandled action type: {action_type}")
+                result = {'status': 'ignored', 'action_type': action_type}
+            
+            # Common fields every listener can rely on
+            result.setdefault('action_type', action_type)
+            result.setdefault('board_id', model.get('id'))
+            result.setdefault('card_id', action.get('data', {}).get('card', {}).get('id'))
+            result['action_id'] = action.get('id')
+            result['action_date'] = action.get('date')
+            
+            for recorder in self._recorders:
+                try:
+                    recorder(dict(result))
+                except Exception as e:
+                    logger.error(f"Webhook recorder {getattr(recorder, '__name__', recorder)} failed: {e}")
+            self.sequencer.submit(result, on_released)
+            return result
+                
+        except Exception as e:
+            logger.error(f"Error processing webhook: {e}")
+            return {'status': 'error', 'message': str(e)}
+    
+    def _handle_card_created(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle card creation"""
+        card_data = action.get('data', {}).get('card', {})
+        list_data = action.get('data', {}).get('list', {})
+        
+        return {
+            'status': 'success',
+            'action': 'card_created',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'list_id': list_data.get('id'),
+            'list_name': list_data.get('name'),
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_card_updated(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle card updates"""
+        card_data = action.get('data', {}).get('card', {})
+        old_data = action.get('data', {}).get('old', {})
+        
+        return {
+            'status': 'success',
+            'action': 'card_updated',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'changes': {
+                'name': old_data.get('name'),
+                'desc': old_data.get('desc'),
+                'due': old_data.get('due'),
+                'idList': old_data.get('idList')
+            },
+            # Previous and new values for every field Trello reports as changed
+            'old': dict(old_data),
+            'updates': {field: card_data.get(field) for field in old_data},
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_card_moved(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle card movement between boards"""
+        card_data = action.get('data', {}).get('card', {})
+        list_data = action.get('data', {}).get('list', {})
+        
+        return {
+            'status': 'success',
+            'action': 'card_moved',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'new_list': list_data.get('name'),
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_card_deleted(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle card deletion"""
+        card_data = action.get('data', {}).get('card', {})
+        
+        return {
+            'status': 'success',
+            'action': 'card_deleted',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_member_added(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle member added to card"""
+        card_data = action.get('data', {}).get('card', {})
+        member_data = action.get('data', {}).get('member', {})
+        
+        return {
+            'status': 'success',
+            'action': 'member_added',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'member_id': member_data.get('id'),
+            'member_name': member_data.get('fullName'),
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_label_added(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle label added to card"""
+        card_data = action.get('data', {}).get('card', {})
+        label_data = action.get('data', {}).get('label', {})
+        
+        return {
+            'status': 'success',
+            'action': 'label_added',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'label': label_data,
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_label_removed(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle label removed from card"""
+        card_data = action.get('data', {}).get('card', {})
+        label_data = action.get('data', {}).get('label', {})
+        
+        return {
+            'status': 'success',
+            'action': 'label_removed',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'label': label_data,
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
+    
+    def _handle_member_removed(self, action: Dict, model: Dict) -> Dict[str, Any]:
+        """Handle member removed from card"""
+        card_data = action.get('data', {}).get('card', {})
+        member_data = action.get('data', {}).get('member', {})
+        
+        return {
+            'status': 'success',
+            'action': 'member_removed',
+            'card_id': card_data.get('id'),
+            'card_name': card_data.get('name'),
+            'member_id': member_data.get('id'),
+            'member_name': member_data.get('fullName'),
+            'board_id': model.get('id'),
+            'board_name': model.get('name')
+        }
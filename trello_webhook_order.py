@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Trello Webhook Ordering
+Drops redelivered webhook actions, puts each card's events back in action order
+and coalesces bursts of card updates into one net change
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from config import TrelloConfig
+
+logger = logging.getLogger(__name__)
+
+# Fields card_updated events summarize under 'changes' (their previous values)
+CHANGE_SUMMARY_FIELDS = ('name', 'desc', 'due', 'idList')
+
+def coalesce_card_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge each run of consecutive card_updated events into one net update
+    
+    Takes one card's events in action order. The merged event keeps the first
+    previous value and the last new value of every field; fields that ended up
+    back where they started are dropped, and so is an update with nothing left.
+    Other events keep their place between runs.
+    """
+    coalesced: List[Dict[str, Any]] = []
+    for event in events:
+        previous = coalesced[-1] if coalesced else None
+        if event.get('action') != 'card_updated' or previous is None or previous.get('action') != 'card_updated':
+            coalesced.append(event)
+            continue
+        
+        merged = dict(event)
+        merged['old'] = {**event.get('old', {}), **previous.get('old', {})}
+        merged['updates'] = {**previous.get('updates', {}), **event.get('updates', {})}
+        merged['action_ids'] = previous.get('action_ids', [previous.get('action_id')]) + [event.get('action_id')]
+        merged['coalesced'] = len(merged['action_ids'])
+        coalesced[-1] = merged
+    
+    net = []
+    for event in coalesced:
+        if event.get('coalesced'):
+            old = event['old']
+            unchanged = [field for field, value in event['updates'].items() if old.get(field) == value]
+            for field in unchanged:
+                del old[field]
+                del event['updates'][field]
+            if not event['updates']:
+                continue
+            event['changes'] = {field: old.get(field) for field in CHANGE_SUMMARY_FIELDS}
+        net.append(event)
+    return net
+
+class RecentActionIndex:
+    """Bounded TTL set of recently seen Trello action ids"""
+    
+    def __init__(self, ttl: float = None, max_size: int = None):
+        self.ttl = ttl if ttl is not None else TrelloConfig.WEBHOOK_DEDUP_TTL
+        self.max_size = max_size or TrelloConfig.WEBHOOK_DEDUP_MAX_SIZE
+        self._seen: 'OrderedDict[str, float]' = OrderedDict()  # action id -> first seen, oldest first
+        self._lock = threading.Lock()
+    
+    def check_and_add(self, action_id: Optional[str]) -> bool:
+        """Record an action id; False if it was already seen within the TTL"""
+        if not action_id:
+            return True  # Nothing to dedup on
+        now = time.monotonic()
+        with self._lock:
+            # Entries are in arrival order, so expired ones are all at the front
+            while self._seen and now - next(iter(self._seen.values())) >= self.ttl:
+                self._seen.popitem(last=False)
+            if action_id in self._seen:
+                return False
+            # Only a new id needs room; the oldest one goes first
+            while len(self._seen) >= self.max_size:
+                self._seen.popitem(last=False)
+            self._seen[action_id] = now
+            return True
+    
+    def __len__(self) -> int:
+        return len(self._seen)
+
+class CardEventSequencer:
+    """Holds each card's events briefly, then releases them in action order, coalesced
+    
+    Trello can deliver a card's actions out of order (and worker threads can
+    finish them out of order), so events for a card wait at least `window`
+    seconds from the first one's arrival, then go to `deliver` sorted by action
+    date. Editing a card emits a burst of updateCard actions, so each new event
+    also pushes the release back to `debounce` seconds after it (up to `max_wait`
+    after the first), and the burst is released as one net update.
+    
+    An event older than something already released for its card can no longer be
+    put in place; it is delivered with late=True so listeners can refetch instead
+    of patching. Events without a card id are delivered straight away.
+    
+    An event's on_release callback runs once it has been delivered (or folded
+    into another event that was), so callers can keep their own copy of it until
+    it has left the buffer.
+    """
+    
+    def __init__(self, deliver: Callable[[Dict[str, Any]], None], window: float = None,
+                 debounce: float = None, max_wait: float = None, max_cards: int = None):
+        self.deliver = deliver
+        self.window = window if window is not None else TrelloConfig.WEBHOOK_REORDER_WINDOW
+        self.debounce = debounce if debounce is not None else TrelloConfig.WEBHOOK_COALESCE_WINDOW
+        self.max_wait = max(self.window, max_wait if max_wait is not None else TrelloConfig.WEBHOOK_COALESCE_MAX_WAIT)
+        self.max_cards = max_cards or TrelloConfig.WEBHOOK_DEDUP_MAX_SIZE
+        
+        self._buffers: Dict[str, List[Tuple[str, int, Dict[str, Any], Optional[Callable[[], None]]]]] = {}  # card id -> [(date, seq, event, on_release)]
+        self._first_seen: Dict[str, float] = {}  # card id -> arrival of its oldest buffered event
+        self._due: Dict[str, float] = {}  # card id -> current release time
+        self._deadlines: List[Tuple[float, str]] = []  # heap of (release time, card id), may hold stale entries
+        self._released: 'OrderedDict[str, str]' = OrderedDict()  # card id -> newest released action date
+        self._seq = itertools.count()
+        self._ready = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        
+        # Stats
+        self.reordered = 0
+        self.late = 0
+        self.coalesced = 0  # Events folded into another one (or cancelled out)
+    
+    def submit(self, event: Dict[str, Any], on_release: Optional[Callable[[], None]] = None):
+        card_id = event.get('card_id')
+        if not card_id:
+            self._deliver_all([event], [on_release])
+            return
+        
+        date = event.get('action_date') or ''
+        with self._ready:
+            if date and date < self._released.get(card_id, ''):
+                self.late += 1
+                event['late'] = True
+            elif self.window > 0 or self.debounce > 0:
+                now = time.monotonic()
+                first = self._first_seen.setdefault(card_id, now)
+                due = min(max(first + self.window, now + self.debounce), first + self.max_wait)
+                if due != self._due.get(card_id):
+                    self._due[card_id] = due
+                    heapq.heappush(self._deadlines, (due, card_id))
+                self._buffers.setdefault(card_id, []).append((date, next(self._seq), event, on_release))
+                self._ensure_worker()
+                self._ready.notify()
+                return
+            else:
+                self._mark_released(card_id, date)
+        self._deliver_all([event], [on_release])
+    
+    def flush(self):
+        """Release every buffered event now"""
+        with self._ready:
+            batches = [self._take(card_id) for card_id in list(self._buffers)]
+            self._deadlines = []
+        for events, callbacks in batches:
+            self._deliver_all(events, callbacks)
+    
+    def pending(self) -> int:
+        with self._ready:
+            return sum(len(buffer) for buffer in self._buffers.values())
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='webhook-sequencer', daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._deadlines or self._deadlines[0][0] > time.monotonic():
+                    timeout = self._deadlines[0][0] - time.monotonic() if self._deadlines else None
+                    self._ready.wait(timeout)
+                due, card_id = heapq.heappop(self._deadlines)
+                if self._due.get(card_id) != due:
+                    continue  # Superseded by a later release time
+                events, callbacks = self._take(card_id)
+            self._deliver_all(events, callbacks)
+    
+    def _take(self, card_id: str) -> Tuple[List[Dict[str, Any]], List[Optional[Callable[[], None]]]]:
+        """Pop a card's buffer in action order, coalesced, with every event's on_release (caller holds the lock)"""
+        buffer = self._buffers.pop(card_id, [])
+        self._first_seen.pop(card_id, None)
+        self._due.pop(card_id, None)
+        ordered = sorted(buffer)
+        self.reordered += sum(1 for queued, in_order in zip(buffer, ordered) if queued is not in_order)
+        if ordered:
+            self._mark_released(card_id, ordered[-1][0])
+        events = coalesce_card_events([event for _, _, event, _ in ordered])
+        self.coalesced += len(ordered) - len(events)
+        return events, [on_release for _, _, _, on_release in ordered]
+    
+    def _mark_released(self, card_id: str, date: str):
+        self._released[card_id] = max(date, self._released.get(card_id, ''))
+        self._released.move_to_end(card_id)
+        while len(self._released) > self.max_cards:
+            self._released.popitem(last=False)
+    
+    def _deliver_all(self, events: List[Dict[str, Any]], callbacks: List[Optional[Callable[[], None]]] = ()):
+        for event in events:
+            try:
+                self.deliver(event)
+            except Exception as e:
+                logger.error(f"Delivering webhook event {event.get('action_id')} failed: {e}")
+        for on_release in callbacks:
+            if on_release is None:
+                continue
+            try:
+                on_release()
+            except Exception as e:
+                logger.error(f"Webhook release callback failed: {e}")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Trello Webhook Queue
+Durable inbox for webhook deliveries, drained by a pool of background workers
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Tuple
+from config import TrelloConfig
+
+logger = logging.getLogger(__name__)
+
+def validate_webhook(webhook_data: Any) -> Optional[str]:
+    """Why a webhook payload can't be processed, or None if it looks like a Trello action"""
+    if not isinstance(webhook_data, dict) or not webhook_data:
+        return 'No data received'
+    action = webhook_data.get('action')
+    if not isinstance(action, dict) or not action.get('type'):
+        return 'Missing action type'
+    if not isinstance(webhook_data.get('model', {}), dict):
+        return 'Invalid model'
+    return None
+
+class WebhookQueue:
+    """SQLite-backed queue between the webhook endpoint and TrelloWebhookHandler
+    
+    The endpoint only validates and appends the raw payload (one small insert), so
+    Trello gets its 200 straight away however slow the listeners are. Worker threads
+    claim the oldest rows and run them through handle_webhook. A row is deleted only
+    once the handler has released its event to the listeners (the sequencer can hold
+    it for a few seconds after handle_webhook returns), so anything still queued,
+    held or claimed by a crashed process when the app stops is processed after a
+    restart. An event delivered just before a crash may be delivered again.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS webhook_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            queue TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            received_at REAL NOT NULL,
+            claim TEXT,
+            claimed_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_webhook_queue_queue ON webhook_queue (queue, id);
+    """
+    POLL_INTERVAL = 1.0  # Seconds an idle worker waits before looking for rows from other processes
+    CLAIM_TIMEOUT = 300  # Seconds before a claimed but unfinished row is handed out again
+    
+    def __init__(self, handler, name: str = 'webhooks', path: str = None, workers: int = None):
+        self.handler = handler
+        self.name = name  # Apps sharing the db file each drain their own queue
+        self.path = path or TrelloConfig.WEBHOOK_QUEUE_DB
+        self.worker_count = max(1, workers or TrelloConfig.WEBHOOK_WORKERS)
+        
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # Commits survive an app crash without an fsync per webhook
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(self.SCHEMA)
+        
+        self._ready = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        
+        # Stats
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.last_lag: Optional[float] = None  # Seconds from receipt to handled, for the last event
+        self.max_lag: Optional[float] = None
+    
+    def enqueue(self, webhook_data: Dict[str, Any]) -> int:
+        """Persist a validated webhook payload; returns its queue id"""
+        payload = json.dumps(webhook_data, separators=(',', ':'))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO webhook_queue (queue, payload, received_at) VALUES (?, ?, ?)',
+                (self.name, payload, time.time())
+            )
+            self.enqueued += 1
+        
+        self.start()
+        with self._ready:
+            self._ready.notify()
+        return cursor.lastrowid
+    
+    def start(self):
+        """Start (or restart) the worker threads; rows left from a previous run are picked up"""
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for index in range(len(self._workers), self.worker_count):
+                worker = threading.Thread(target=self._work, name=f'webhook-worker-{self.name}-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+    
+    def _work(self):
+        while True:
+            row = self._claim()
+            if row is None:
+                with self._ready:
+                    self._ready.wait(self.POLL_INTERVAL)
+                continue
+            self._process(*row)
+    
+    def _claim(self) -> Optional[Tuple[int, str, float]]:
+        """Take the oldest unclaimed (or abandoned) row for this queue"""
+        claim = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """UPDATE webhook_queue SET claim = ?, claimed_at = ?
+                   WHERE id = (SELECT id FROM webhook_queue
+                               WHERE queue = ? AND (claimed_at IS NULL OR claimed_at < ?)
+                               ORDER BY id LIMIT 1)""",
+                (claim, now, self.name, now - self.CLAIM_TIMEOUT)
+            )
+            row = self._conn.execute(
+                'SELECT id, payload, received_at FROM webhook_queue WHERE claim = ?', (claim,)
+            ).fetchone()
+            if row:
+                self.in_flight += 1
+        return row
+    
+    def _process(self, row_id: int, payload: str, received_at: float):
+        try:
+            result = self.handler.handle_webhook(
+                json.loads(payload),
+                on_released=lambda: self._finish(row_id, received_at, False)
+            )
+            failed = result.get('status') == 'error'
+        except Exception as e:
+            logger.error(f"Webhook {row_id} failed: {e}")
+            failed = True
+        
+        if failed:
+            # Failed events are dropped rather than retried forever; the next sync covers them
+            self._finish(row_id, received_at, True)
+    
+    def _finish(self, row_id: int, received_at: float, failed: bool):
+        """Delete a handled row and count it (once, however often it is called)"""
+        lag = time.time() - received_at
+        with self._lock, self._conn:
+            if not self._conn.execute('DELETE FROM webhook_queue WHERE id = ?', (row_id,)).rowcount:
+                return
+            self.in_flight -= 1
+            self.processed += 1
+            self.failed += failed
+            self.last_lag = lag
+            self.max_lag = lag if self.max_lag is None else max(self.max_lag, lag)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth, oldest = self._conn.execute(
+                'SELECT COUNT(*), MIN(received_at) FROM webhook_queue WHERE queue = ?', (self.name,)
+            ).fetchone()
+            return {
+                'queue': self.name,
+                'workers': sum(worker.is_alive() for worker in self._workers),
+                'depth': depth,
+                'in_flight': self.in_flight,
+                'oldest_age_seconds': round(time.time() - oldest, 3) if oldest is not None else 0.0,
+                'enqueued': self.enqueued,
+                'processed': self.processed,
+                'failed': self.failed,
+                'last_lag_seconds': round(self.last_lag, 3) if self.last_lag is not None else None,
+                'max_lag_seconds': round(self.max_lag, 3) if self.max_lag is not None else None
+            }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,18 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 from trello_views import TrelloViewManager
+from trello_virtual_master import VirtualMasterBoard
 from trello_api import TrelloAPIService
+from trello_client import get_shared_client
+from trello_cache import get_metadata_cache
+from trello_webhook_handler import TrelloWebhookHandler
+from trello_webhook_queue import WebhookQueue, validate_webhook
+from trello_event_stream import EventBroadcaster
+from trello_event_log import EventLog
+from trello_fields import ACCOUNT_MANAGEMENT_PROJECTION
+from config import TrelloConfig
 import os
+import threading
+from typing import Optional
 
 app = Flask(__name__)
 
@@ -13,9 +24,56 @@ TRELLO_TOKEN = os.getenv('TRELLO_TOKEN')
 if not TRELLO_TOKEN:
     raise ValueError("TRELLO_TOKEN environment variable is required")
 
-view_manager = TrelloViewManager(MASTER_BOARD_ID)
+# In virtual master mode source cards are merged into the views instead of synced onto the board
+view_manager = TrelloViewManager(
+    MASTER_BOARD_ID,
+    virtual_master=VirtualMasterBoard() if TrelloConfig.VIRTUAL_MASTER else None
+)
 api_service = TrelloAPIService()
 
+# Webhook events patch the view cache and invalidate board metadata in place
+webhook_handler = TrelloWebhookHandler()
+webhook_handler.add_listener(view_manager.handle_webhook_event)
+webhook_handler.add_listener(get_metadata_cache().handle_webhook_event)
+if TrelloConfig.REALTIME_SYNC and not TrelloConfig.VIRTUAL_MASTER:
+    # ...and copy source card changes to the master board as they happen
+    from trello_realtime_sync import get_realtime_sync
+    webhook_handler.add_listener(get_realtime_sync().handle_webhook_event)
+# ...and push every event to connected dashboards over /api/stream
+event_broadcaster = EventBroadcaster(
+    board_names={board_id: name for name, board_id in webhook_handler.boards.items()},
+    project_of=lambda event: view_manager.get_cached_project(event.get('card_id'))
+)
+webhook_handler.add_listener(event_broadcaster.handle_webhook_event)
+
+# Deliveries are queued by the endpoint and handled by background workers. Those
+# (and the event log) start with the first request, so the debug reloader's
+# watcher process never drains the queue into a view cache nobody reads
+webhook_queue: Optional[WebhookQueue] = None
+event_log: Optional[EventLog] = None
+_pipeline_lock = threading.Lock()
+
+@app.before_request
+def start_webhook_pipeline():
+    """Open the event log and start the queue workers on the first request"""
+    global webhook_queue, event_log
+    if webhook_queue is not None:
+        return
+    with _pipeline_lock:
+        if webhook_queue is not None:
+            return
+        if TrelloConfig.EVENT_LOG:
+            # Keep a replayable history of the events on disk
+            try:
+                event_log = EventLog(os.path.join(TrelloConfig.EVENT_LOG_DIR, 'dashboard'))
+                webhook_handler.add_recorder(event_log.handle_webhook_event)
+            except RuntimeError as e:
+                # Another process (e.g. a second server worker) is already writing this log
+                print(f"⚠️ Event log disabled: {e}")
+        queue = WebhookQueue(webhook_handler, name='dashboard')
+        queue.start()  # Picks up deliveries left from the previous run
+        webhook_queue = queue
+
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
@@ -158,65 +216,57 @@ def create_deliverable():
 def get_account_management_data():
     """Get data from the Account Management board"""
     try:
-        from trello_client import TrelloClient
-        client = TrelloClient()
+        client = get_shared_client()
         
-        # Get the Account Management board
+        # Get the Account Management board with its lists, cards, card custom field
+        # items, card members and custom field definitions in a single request
         board_id = '68e95255081b416a51143bc6'
-        board = client.get_board(board_id)
-        lists = client.get_board_lists(board_id)
-        cards = client.get_board_cards(board_id)
+        snapshot = client.get_board_snapshot(
+            board_id,
+            include=('lists', 'cards', 'card_custom_fields', 'card_members', 'custom_fields'),
+            fields=ACCOUNT_MANAGEMENT_PROJECTION
+        )
+        board = snapshot.board
+        cards = snapshot.cards
+        custom_fields = snapshot.custom_fields
+        print(f"Custom fields found: {len(custom_fields)}")
         
         # Organize data by lists
         deliverables = []
         account_tasks = []
         
-        # Get custom fields for the board
-        try:
-            custom_fields = client._make_request(f'boards/{board_id}/customFields')
-            print(f"Custom fields found: {len(custom_fields)}")
-            
-            # Build a mapping of custom field options
-            custom_field_options = {}
-            for cf in custom_fields:
-                if 'options' in cf:
-                    custom_field_options[cf['id']] = {opt['id']: opt['value']['text'] for opt in cf['options']}
-                else:
-                    custom_field_options[cf['id']] = {}
-        except Exception as e:
-            print(f"Error fetching custom fields: {e}")
-            custom_fields = []
-            custom_field_options = {}
+        # Build a mapping of custom field options
+        custom_field_options = {}
+        for cf in custom_fields:
+            if 'options' in cf:
+                custom_field_options[cf['id']] = {opt['id']: opt['value']['text'] for opt in cf['options']}
+            else:
+                custom_field_options[cf['id']] = {}
         
         for card in cards:
             # Find which list the card is in
-            card_list = next((lst for lst in lists if lst['id'] == card['idList']), None)
+            card_list = snapshot.get_list(card['idList'])
             
             if card_list:
                 # Get custom field values for this card
                 custom_field_values = {}
-                try:
-                    card_custom_fields = client._make_request(f'cards/{card["id"]}/customFieldItems')
-                    for cf_item in card_custom_fields:
-                        # Find the custom field definition
-                        cf_def = next((cf for cf in custom_fields if cf['id'] == cf_item['idCustomField']), None)
-                        if cf_def:
-                            # Check if this field has options and use idValue to get the text
-                            if cf_item.get('idValue') and cf_def['id'] in custom_field_options:
-                                option_id = cf_item['idValue']
-                                if option_id in custom_field_options[cf_def['id']]:
-                                    value = custom_field_options[cf_def['id']][option_id]
-                                    custom_field_values[cf_def['name']] = value
-                            elif cf_item.get('value'):
-                                # Handle different custom field types for non-option fields
-                                if isinstance(cf_item['value'], dict):
-                                    value = cf_item['value'].get('text', '')
-                                else:
-                                    value = str(cf_item['value'])
+                for cf_item in card.get('customFieldItems', []):
+                    # Find the custom field definition
+                    cf_def = next((cf for cf in custom_fields if cf['id'] == cf_item['idCustomField']), None)
+                    if cf_def:
+                        # Check if this field has options and use idValue to get the text
+                        if cf_item.get('idValue') and cf_def['id'] in custom_field_options:
+                            option_id = cf_item['idValue']
+                            if option_id in custom_field_options[cf_def['id']]:
+                                value = custom_field_options[cf_def['id']][option_id]
                                 custom_field_values[cf_def['name']] = value
-                except Exception as e:
-                    print(f"Error fetching custom fields for card {card['id']}: {e}")
-                    # Continue without custom fields if there's an error
+                        elif cf_item.get('value'):
+                            # Handle different custom field types for non-option fields
+                            if isinstance(cf_item['value'], dict):
+                                value = cf_item['value'].get('text', '')
+                            else:
+                                value = str(cf_item['value'])
+                            custom_field_values[cf_def['name']] = value
                 
                 card_data = {
                     'id': card['id'],
@@ -253,14 +303,14 @@ def get_account_management_data():
 def create_deliverable_inline():
     """Create a new deliverable in Trello from inline form"""
     try:
-        from trello_client import TrelloClient
-        client = TrelloClient()
+        client = get_shared_client()
+        metadata = get_metadata_cache()
         
         data = request.get_json()
         board_id = '68e95255081b416a51143bc6'  # Account Management board
         
         # Find the Deliverables list
-        lists = client.get_board_lists(board_id)
+        lists = metadata.get_lists(board_id)
         deliverables_list = next((lst for lst in lists if 'Deliverables' in lst['name']), None)
         
         if not deliverables_list:
@@ -279,26 +329,21 @@ def create_deliverable_inline():
         
         # Set custom fields for the card
         if new_card:
-            # Get custom fields
-            custom_fields = client._make_request(f'boards/{board_id}/customFields')
-            
             # Set Client custom field
-            client_field = next((cf for cf in custom_fields if cf['name'] == 'Client'), None)
-            if client_field:
-                client_option = next((opt for opt in client_field['options'] if opt['value']['text'] == data['client']), None)
-                if client_option:
-                    client._make_request(f'cards/{new_card["id"]}/customField/{client_field["id"]}/item', 
-                                       method='PUT', 
-                                       data={'idValue': client_option['id']})
+            client_field = metadata.get_custom_field(board_id, 'Client')
+            client_option_id = metadata.get_custom_field_option_id(board_id, 'Client', data['client'])
+            if client_field and client_option_id:
+                client._make_request(f'cards/{new_card["id"]}/customField/{client_field["id"]}/item', 
+                                   method='PUT', 
+                                   data={'idValue': client_option_id})
             
             # Set Project custom field
-            project_field = next((cf for cf in custom_fields if cf['name'] == 'Project'), None)
-            if project_field:
-                project_option = next((opt for opt in project_field['options'] if opt['value']['text'] == data['project']), None)
-                if project_option:
-                    client._make_request(f'cards/{new_card["id"]}/customField/{project_field["id"]}/item', 
-                                       method='PUT', 
-                                       data={'idValue': project_option['id']})
+            project_field = metadata.get_custom_field(board_id, 'Project')
+            project_option_id = metadata.get_custom_field_option_id(board_id, 'Project', data['project'])
+            if project_field and project_option_id:
+                client._make_request(f'cards/{new_card["id"]}/customField/{project_field["id"]}/item', 
+                                   method='PUT', 
+                                   data={'idValue': project_option_id})
         
         return jsonify({'success': True, 'message': 'Deliverable created', 'card_id': new_card['id']})
         
@@ -309,14 +354,14 @@ def create_deliverable_inline():
 def create_admin_task_inline():
     """Create a new admin task in Trello from inline form"""
     try:
-        from trello_client import TrelloClient
-        client = TrelloClient()
+        client = get_shared_client()
+        metadata = get_metadata_cache()
         
         data = request.get_json()
         board_id = '68e95255081b416a51143bc6'  # Account Management board
         
         # Find the Account Tasks list
-        lists = client.get_board_lists(board_id)
+        lists = metadata.get_lists(board_id)
         admin_tasks_list = next((lst for lst in lists if 'Account Tasks' in lst['name']), None)
         
         if not admin_tasks_list:
@@ -335,32 +380,25 @@ def create_admin_task_inline():
         
         # Set custom fields for the card
         if new_card:
-            # Get custom fields
-            custom_fields = client._make_request(f'boards/{board_id}/customFields')
-            
             # Set Client custom field
-            client_field = next((cf for cf in custom_fields if cf['name'] == 'Client'), None)
-            if client_field:
-                client_option = next((opt for opt in client_field['options'] if opt['value']['text'] == data['client']), None)
-                if client_option:
-                    client._make_request(f'cards/{new_card["id"]}/customField/{client_field["id"]}/item', 
-                                       method='PUT', 
-                                       data={'idValue': client_option['id']})
+            client_field = metadata.get_custom_field(board_id, 'Client')
+            client_option_id = metadata.get_custom_field_option_id(board_id, 'Client', data['client'])
+            if client_field and client_option_id:
+                client._make_request(f'cards/{new_card["id"]}/customField/{client_field["id"]}/item', 
+                                   method='PUT', 
+                                   data={'idValue': client_option_id})
             
             # Set Project custom field
-            project_field = next((cf for cf in custom_fields if cf['name'] == 'Project'), None)
-            if project_field:
-                project_option = next((opt for opt in project_field['options'] if opt['value']['text'] == data['project']), None)
-                if project_option:
-                    client._make_request(f'cards/{new_card["id"]}/customField/{project_field["id"]}/item', 
-                                       method='PUT', 
-                                       data={'idValue': project_option['id']})
+            project_field = metadata.get_custom_field(board_id, 'Project')
+            project_option_id = metadata.get_custom_field_option_id(board_id, 'Project', data['project'])
+            if project_field and project_option_id:
+                client._make_request(f'cards/{new_card["id"]}/customField/{project_field["id"]}/item', 
+                                   method='PUT', 
+                                   data={'idValue': project_option_id})
             
             # Add label if provided
             if data.get('label'):
-                # Get board labels
-                board_labels = client._make_request(f'boards/{board_id}/labels')
-                label = next((lbl for lbl in board_labels if lbl['name'] == data['label']), None)
+                label = metadata.get_label(board_id, data['label'])
                 if label:
                     client._make_request(f'cards/{new_card["id"]}/idLabels', 
                                        method='POST', 
@@ -375,8 +413,8 @@ def create_admin_task_inline():
 def update_admin_task(task_id):
     """Update an existing admin task in Trello"""
     try:
-        from trello_client import TrelloClient
-        client = TrelloClient()
+        client = get_shared_client()
+        metadata = get_metadata_cache()
         
         data = request.get_json()
         board_id = '68e95255081b416a51143bc6'  # Account Management board
@@ -391,18 +429,14 @@ def update_admin_task(task_id):
         if card_data:
             client._make_request(f'cards/{task_id}', method='PUT', data=card_data)
         
-        # Update custom fields
-        custom_fields = client._make_request(f'boards/{board_id}/customFields')
-        
         # Update Project custom field
         if 'project' in data and data['project']:
-            project_field = next((cf for cf in custom_fields if cf['name'] == 'Project'), None)
-            if project_field:
-                project_option = next((opt for opt in project_field['options'] if opt['value']['text'] == data['project']), None)
-                if project_option:
-                    client._make_request(f'cards/{task_id}/customField/{project_field["id"]}/item', 
-                                       method='PUT', 
-                                       data={'idValue': project_option['id']})
+            project_field = metadata.get_custom_field(board_id, 'Project')
+            project_option_id = metadata.get_custom_field_option_id(board_id, 'Project', data['project'])
+            if project_field and project_option_id:
+                client._make_request(f'cards/{task_id}/customField/{project_field["id"]}/item', 
+                                   method='PUT', 
+                                   data={'idValue': project_option_id})
         
         # Update labels
         if 'label' in data:
@@ -414,8 +448,7 @@ def update_admin_task(task_id):
             
             # Add new label if provided
             if data['label']:
-                board_labels = client._make_request(f'boards/{board_id}/labels')
-                label = next((lbl for lbl in board_labels if lbl['name'] == data['label']), None)
+                label = metadata.get_label(board_id, data['label'])
                 if label:
                     client._make_request(f'cards/{task_id}/idLabels', 
                                        method='POST', 
@@ -431,29 +464,44 @@ def update_admin_task(task_id):
 def trello_webhook():
     """Endpoint to receive Trello webhooks"""
     try:
-        webhook_data = request.get_json()
-        print(f"Received webhook: {webhook_data}")
-        
-        # Process the webhook data
-        if webhook_data:
-            action = webhook_data.get('action', {})
-            action_type = action.get('type')
-            model = webhook_data.get('model', {})
-            
-            print(f"Action: {action_type} on {model.get('name', 'Unknown')}")
-            
-            # Here you would typically:
-            # 1. Update your database/cache
-            # 2. Send real-time updates to connected clients (WebSocket/SSE)
-            # 3. Trigger any business logic
-            
-            return jsonify({'status': 'success'}), 200
-        else:
-            return jsonify({'error': 'No data received'}), 400
+        webhook_data = request.get_json(silent=True)
+        
+        error = validate_webhook(webhook_data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        # Workers run it through the handler, whose listeners patch/invalidate the
+        # view and metadata caches, push it to /api/stream clients (and queue
+        # real-time sync when enabled)
+        webhook_queue.enqueue(webhook_data)
+        
+        return jsonify({'status': 'success'}), 200
         
     except Exception as e:
         print(f"Webhook error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/stream')
+def stream_events():
+    """Server-Sent Events feed of board changes
+    
+    Optional filters, repeatable or comma-separated: ?board=<name or id>&project=<name>.
+    A 'resync' event means this client fell behind and should refetch its data.
+    """
+    boards = [value for arg in request.args.getlist('board') for value in arg.split(',') if value]
+    projects = [value for arg in request.args.getlist('project') for value in arg.split(',') if value]
+    client = event_broadcaster.subscribe(boards=boards, projects=projects)
+    return Response(
+        stream_with_context(event_broadcaster.stream(client)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/webhook-stats')
+def get_webhook_stats():
+    """Webhook queue depth, lag and throughput, plus dedup/reorder counts"""
+    return jsonify({**webhook_queue.get_stats(), **webhook_handler.get_stats(), 'stream': event_broadcaster.get_stats(),
+                    'event_log': event_log.get_stats() if event_log else None})
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)